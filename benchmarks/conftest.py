@@ -0,0 +1,49 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Fixtures of the benchmark suite.
+
+Run it with ``pytest benchmarks``. The suite requires pytest-benchmark and is
+not collected by the regular test run.
+"""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+import wlts  # noqa: E402
+
+from .server import MockServer  # noqa: E402
+
+
+def pytest_addoption(parser):
+    """Add the latency of the stand-in server to the command line."""
+    parser.addoption('--latency', type=float, default=0.0,
+                     help='Seconds waited by the stand-in WLTS/LCCS server before each response.')
+
+
+@pytest.fixture(scope='session')
+def server(request):
+    """Serve the fixtures of tests/jsons with the latency given on the command line."""
+    with MockServer(latency=request.config.getoption('--latency')) as server:
+        yield server
+
+
+@pytest.fixture
+def service(server):
+    """Return a client of the stand-in server."""
+    with wlts.WLTS(server.wlts_url, lccs_url=server.lccs_url) as service:
+        yield service
@@ -0,0 +1,192 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""A local stand-in of the WLTS and LCCS services, serving the fixtures of ``tests/jsons``."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+#: The directory of the JSON documents served.
+FIXTURES = Path(__file__).resolve().parent.parent / 'tests' / 'jsons'
+
+#: The pixel returned as geometry of every record.
+PIXEL = {'type': 'Polygon', 'coordinates': [[[-54.0, -12.0], [-53.9, -12.0], [-53.9, -11.9], [-54.0, -12.0]]]}
+
+
+def _load(name):
+    """Load a fixture document."""
+    with open(FIXTURES / name, encoding='utf-8') as file:
+        return json.load(file)
+
+
+class MockServer:
+    """Serve WLTS under ``/wlts`` and LCCS under ``/lccs`` on a local port, with a fixed latency per request.
+
+    Every trajectory holds the records of ``trajectory.json`` for the queried
+    location, and every LCCS mapping translates the classes of those records into
+    ``Floresta``, so harmonization touches every record.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        """Create the server.
+
+        Args:
+            latency (float): The seconds waited before answering each request.
+        """
+        self.latency = latency
+        self.requests = 0
+
+        self._trajectory = _load('trajectory.json')
+        self._collections = _load('list_collections.json')
+        self._describe = dict(_load('describe_collection.json'), classification_system={'id': 'mapbiomas-v5'})
+        self._classes = sorted({record['class'] for record in self._trajectory['result']['trajectory']})
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server."""
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def wlts_url(self) -> str:
+        """Return the URL of the WLTS service."""
+        return f'{self.url}/wlts'
+
+    @property
+    def lccs_url(self) -> str:
+        """Return the URL of the LCCS service."""
+        return f'{self.url}/lccs'
+
+    def start(self) -> "MockServer":
+        """Serve the requests in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving the requests."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockServer":
+        """Start the server as a context manager."""
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        """Stop the server."""
+        self.stop()
+
+    def trajectory(self, latitude, longitude, geometry=False):
+        """Return the trajectory document of a location."""
+        records = self._trajectory['result']['trajectory']
+
+        if geometry:
+            records = [dict(record, geom=PIXEL) for record in records]
+
+        query = dict(self._trajectory['query'], latitude=latitude, longitude=longitude)
+
+        return {'query': query, 'result': {'trajectory': records}}
+
+    def route(self, method, path, params, body):
+        """Return the document answering a request, or ``None`` if the path is unknown."""
+        geometry = str(params.get('geometry', '')).lower() == 'true'
+
+        if path in ('/wlts', '/wlts/', '/lccs', '/lccs/'):
+            return {'supported_language': [{'language': 'pt-br'}, {'language': 'en'}]}
+
+        if path == '/wlts/list_collections':
+            return self._collections
+
+        if path == '/wlts/describe_collection':
+            return dict(self._describe, name=params.get('collection_id', self._describe['name']))
+
+        if path == '/wlts/trajectory' and method == 'POST':
+            return {'trajectories': [self.trajectory(p['latitude'], p['longitude'], body.get('geometry') in (True, 'true'))
+                                     for p in body['points']]}
+
+        if path == '/wlts/trajectory':
+            return self.trajectory(float(params['latitude']), float(params['longitude']), geometry)
+
+        if path == '/lccs/classification_systems':
+            return []
+
+        if path.startswith('/lccs/mappings/'):
+            return [
+                {
+                    'degree_of_similarity': 1.0,
+                    'links': [
+                        {'rel': 'item', 'title': 'Link to source class', 'href': f'{self.lccs_url}/classes/{i}'},
+                        {'rel': 'item', 'title': 'Link to target class', 'href': f'{self.lccs_url}/classes/target'},
+                    ],
+                } for i in range(len(self._classes))
+            ]
+
+        if path == '/lccs/classes/target':
+            return {'id': 0, 'name': 'Floresta', 'title': 'Floresta'}
+
+        if path.startswith('/lccs/classes/'):
+            index = int(path.rsplit('/', 1)[1])
+            return {'id': index + 1, 'name': self._classes[index], 'title': self._classes[index]}
+
+        return None
+
+    def _handler(self):
+        """Build the request handler class bound to this server."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _reply(self, method):
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                server.requests += 1
+                document = server.route(method, url.path.rstrip('/') or '/', params, body)
+
+                content = json.dumps(document if document is not None else {'message': 'Not Found'}).encode()
+
+                self.send_response(200 if document is not None else 404)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self._reply('GET')
+
+            def do_POST(self):
+                self._reply('POST')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
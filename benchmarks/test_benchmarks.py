@@ -0,0 +1,98 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Benchmarks of trajectory retrieval, harmonization, conversion and startup."""
+import subprocess
+import sys
+
+import pytest
+
+POINTS = 50
+
+LATITUDES = [-12.0 - i * 0.01 for i in range(POINTS)]
+
+LONGITUDES = [-54.0 - i * 0.01 for i in range(POINTS)]
+
+
+def run(command):
+    """Run a Python snippet in a fresh interpreter."""
+    subprocess.run([sys.executable, '-c', command], check=True, capture_output=True)
+
+
+def test_tj_single_point(benchmark, service):
+    """Retrieve the trajectory of a single point."""
+    tj = benchmark(service.tj, latitude=-12.0, longitude=-54.0)
+
+    assert tj.trajectory
+
+
+@pytest.mark.parametrize('max_workers, batch_size', [(None, None), (8, None), (None, 10), (4, 10)])
+def test_tj_points(benchmark, service, max_workers, batch_size):
+    """Retrieve the trajectories of many points, one at a time, concurrently and in batch requests."""
+    tj = benchmark(service.tj, latitude=LATITUDES, longitude=LONGITUDES,
+                   max_workers=max_workers, batch_size=batch_size)
+
+    assert len(tj['trajectories']) == POINTS
+
+
+def test_harmonize(benchmark, service):
+    """Translate the classes of many trajectories, with the LCCS mappings already cached."""
+    tj = service.tj(latitude=LATITUDES, longitude=LONGITUDES, max_workers=8)
+    service.harmonize(tj, 'PRODES')
+
+    result = benchmark(service.harmonize, tj, 'PRODES')
+
+    assert all(record['class'] == 'Floresta' for trj in result['trajectories'] for record in trj.trajectory)
+
+
+def test_harmonize_cold(benchmark, service):
+    """Translate the classes of a trajectory, retrieving the LCCS mappings each time."""
+    tj = service.tj(latitude=-12.0, longitude=-54.0)
+
+    def harmonize():
+        service.clear_cache()
+        return service.harmonize(tj, 'PRODES')
+
+    assert benchmark(harmonize).trajectory
+
+
+def test_trajectories_df(benchmark, service):
+    """Convert many trajectories into a dataframe."""
+    tj = service.tj(latitude=LATITUDES, longitude=LONGITUDES, max_workers=8)
+
+    df = benchmark(tj.df)
+
+    assert len(df) == sum(len(trj.trajectory) for trj in tj['trajectories'])
+
+
+def test_trajectories_geodf(benchmark, service):
+    """Convert many trajectories with geometries into a geodataframe."""
+    tj = service.tj(latitude=LATITUDES, longitude=LONGITUDES, max_workers=8, geometry=True)
+
+    gdf = benchmark(tj.geodf)
+
+    assert gdf.geometry.name == 'geom'
+
+
+def test_import_time(benchmark):
+    """Import the package in a fresh interpreter."""
+    benchmark.pedantic(run, args=('import wlts',), rounds=5)
+
+
+def test_cli_startup(benchmark):
+    """Start the command line interface and print its help."""
+    benchmark.pedantic(run, args=('from wlts.cli import cli; cli(["--help"])',), rounds=5)
@@ -8,14 +8,24 @@
 
 """Unit-test for WLTS."""
 
+import asyncio
 import json
 import os
+import random
 import re
+import subprocess
+import sys
+import time
 from pathlib import Path
+from types import SimpleNamespace
 
+import httpx
+import numpy as np
+import pandas as pd
 import pytest
 from click.testing import CliRunner
 from pkg_resources import resource_filename, resource_string
+from shapely.geometry import shape
 
 import wlts
 from wlts.cli import Config
@@ -24,10 +34,38 @@ url = os.environ.get('WLTS_SERVER_URL', 'http://localhost:5000/wlts')
 match_url = re.compile(url)
 
 
-@pytest.fixture
-def requests_mock(requests_mock):
-    requests_mock.get(re.compile('https://geojson.org/'), real_http=True)
-    yield requests_mock
+def mock_transport(payload, status_code=200):
+    """Build a transport that answers every WLTS request with the given payload."""
+    def handler(request):
+        assert match_url.match(str(request.url))
+        return httpx.Response(status_code, json=payload,
+                              headers={'content-type': 'application/json'})
+
+    return httpx.MockTransport(handler)
+
+
+class FakeLCCS:
+    """Stand-in for the LCCS client mapping every MapBiomas forest class into PRODES."""
+
+    calls = []
+
+    def __init__(self, url, access_token=None):
+        pass
+
+    def mappings(self, system_source, system_target):
+        FakeLCCS.calls.append((system_source, system_target))
+        return FakeMappingGroup()
+
+
+class FakeMappingGroup:
+    """Stand-in for a group of LCCS mappings, which retrieves its classes on each access to ``mappings``."""
+
+    @property
+    def mappings(self):
+        FakeLCCS.calls.append('classes')
+        forest = SimpleNamespace(source_class=SimpleNamespace(title='Formação Florestal'),
+                                 target_class=SimpleNamespace(title='Floresta'))
+        return [forest]
 
 
 @pytest.fixture(scope='session')
@@ -73,12 +111,29 @@ class TestWLTS:
         assert str(service) == f'WLTS:\n\tURL: {url}'
         assert repr(service) == f'wlts(url="{url}")'
 
-    def test_list_collection(self, wlts_objects, requests_mock):
+    def test_lazy_imports(self):
+        heavy = ('pandas', 'geopandas', 'shapely', 'lccs', 'jinja2', 'plotly', 'wlts.cli')
+        code = f"import sys, wlts; print([m for m in {heavy!r} if m in sys.modules])"
+
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+        assert output.stdout.strip() == '[]'
+
+    def test_client_reuse(self, wlts_objects):
         for k in wlts_objects:
-            s = wlts.WLTS(url)
-            requests_mock.get(match_url, json=wlts_objects[k]['list_collections.json'],
-                              status_code=200,
-                              headers={'content-type': 'application/json'})
+            with wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['list_collections.json'])) as s:
+                client = s.client
+                s.collections
+                s.collections
+
+                assert s.client is client
+                assert not client.is_closed
+
+            assert client.is_closed
+
+    def test_list_collection(self, wlts_objects):
+        for k in wlts_objects:
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['list_collections.json']))
 
             response = s.collections
 
@@ -86,13 +141,9 @@ class TestWLTS:
             assert response == ["prodes_amz", "prodes_cerrado", "deter_amz",
                                 "deter_cerrado", "mapbiomas_4_1_amz"]
 
-    def test_describe_collection(self, wlts_objects, requests_mock):
+    def test_describe_collection(self, wlts_objects):
         for k in wlts_objects:
-            s = wlts.WLTS(url)
-
-            requests_mock.get(match_url, json=wlts_objects[k]['describe_collection.json'],
-                              status_code=200,
-                              headers={'content-type': 'application/json'})
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['describe_collection.json']))
 
             collection = s['prodes_cerrado']
 
@@ -105,13 +156,73 @@ class TestWLTS:
             assert collection['resolution_unit']
             assert collection['spatial_extent']
 
-    def test_trajectory(self, wlts_objects, requests_mock):
+    def test_metadata_cache(self, wlts_objects):
         for k in wlts_objects:
-            s = wlts.WLTS(url)
+            calls = []
 
-            requests_mock.get(match_url, json=wlts_objects[k]['trajectory.json'],
-                              status_code=200,
-                              headers={'content-type': 'application/json'})
+            def handler(request):
+                calls.append(request.url.path)
+                if request.url.path.endswith('list_collections'):
+                    return httpx.Response(200, json=wlts_objects[k]['list_collections.json'])
+                return httpx.Response(200, json=wlts_objects[k]['describe_collection.json'])
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            assert s.collections == s.collections
+            assert s['prodes_cerrado'] == s['prodes_cerrado']
+            assert len(calls) == 2
+
+            s.clear_cache('prodes_cerrado')
+            s['prodes_cerrado']
+            s.collections
+            assert len(calls) == 3
+
+            s.clear_cache()
+            s.collections
+            assert len(calls) == 4
+
+    def test_describe_many(self, wlts_objects):
+        for k in wlts_objects:
+            names = wlts_objects[k]['list_collections.json']['collections']
+
+            def handler(request):
+                if request.url.path.endswith('list_collections'):
+                    return httpx.Response(200, json=wlts_objects[k]['list_collections.json'])
+                time.sleep(random.uniform(0, 0.01))
+                name = request.url.params['collection_id']
+                return httpx.Response(200, json=dict(wlts_objects[k]['describe_collection.json'], name=name))
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            assert [c.name for c in s.describe_many(names[::-1], max_workers=4)] == names[::-1]
+            assert [c.name for c in s] == names
+
+            async def main():
+                async with wlts.AsyncWLTS(url, transport=httpx.MockTransport(handler)) as service:
+                    return [c.name async for c in service], await service.describe_many(names[:2], max_workers=1)
+
+            listed, described = asyncio.run(main())
+            assert listed == names
+            assert [c.name for c in described] == names[:2]
+
+    def test_ttl_cache(self):
+        now = [0.0]
+        cache = wlts.cache.TTLCache(maxsize=2, ttl=10, timer=lambda: now[0])
+
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        cache.set('c', 3)
+        assert 'b' not in cache
+        assert cache.get('a') == 1
+
+        now[0] = 10.0
+        assert cache.get('a') is None
+        assert 'c' not in cache
+
+    def test_trajectory(self, wlts_objects):
+        for k in wlts_objects:
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
 
             trajectory = s.tj(latitude=-12.0, longitude=-54.0, start_date='2001', end_date='2011',
                               collections='mapbiomas5_amazonia')
@@ -122,24 +233,657 @@ class TestWLTS:
             assert trajectory['query']['longitude']
             assert 'trajectory' in trajectory['result']
 
+    def test_retries(self, wlts_objects):
+        for k in wlts_objects:
+            responses = [httpx.Response(503, headers={'retry-after': '0'}), httpx.Response(429)]
+
+            def handler(request):
+                if responses:
+                    return responses.pop(0)
+                return httpx.Response(200, json=wlts_objects[k]['list_collections.json'])
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler), backoff_factor=0)
+            assert s.collections == wlts_objects[k]['list_collections.json']['collections']
+
+            responses = [httpx.Response(502)] * 2
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler), retries=1, backoff_factor=0)
+            with pytest.raises(httpx.HTTPStatusError):
+                s.collections
+
+    def test_compression(self, wlts_objects):
+        import gzip
+
+        from wlts.metrics import MetricsCollector
+
+        for k in wlts_objects:
+            headers = []
+            content = json.dumps(wlts_objects[k]['trajectory.json']).encode()
+
+            def handler(request):
+                headers.append(request.headers['accept-encoding'])
+                # An iterator is streamed, like a response read from the network.
+                return httpx.Response(200, content=iter([gzip.compress(content)]),
+                                      headers={'content-type': 'application/json', 'content-encoding': 'gzip'})
+
+            metrics = MetricsCollector()
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler), hooks=metrics)
+
+            records = wlts_objects[k]['trajectory.json']['result']['trajectory']
+            assert [r['class'] for r in s.tj(latitude=-12.0, longitude=-54.0).trajectory] == [r['class'] for r in records]
+            assert 'gzip' in headers[0].split(', ')
+
+            stats = metrics.to_dict()['requests']['trajectory']
+            assert stats['bytes'] == len(content)
+            assert 0 < stats['wire_bytes'] < stats['bytes']
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler), compression=False)
+            s.tj(latitude=-12.0, longitude=-54.0)
+            assert headers[-1] == 'identity'
+
+    def test_error_body(self):
+        error = {'code': 404, 'description': 'Collection not found'}
+        transport = mock_transport(error, status_code=404)
+
+        with pytest.raises(httpx.HTTPStatusError) as exc:
+            wlts.WLTS(url, transport=transport, retries=0)['unknown']
+        assert exc.value.response.json() == error
+
+        async def describe():
+            async with wlts.AsyncWLTS(url, transport=transport, retries=0) as service:
+                await service.describe('unknown')
+
+        with pytest.raises(httpx.HTTPStatusError) as exc:
+            asyncio.run(describe())
+        assert 'Collection not found' in exc.value.response.text
+
+    def test_json_decoder(self, monkeypatch):
+        from wlts.utils import _json_decoder, json_loads
+
+        assert json_loads(b'{"a": [1, 2.5, "\xc3\xa7"]}') == {'a': [1, 2.5, 'ç']}
+        with pytest.raises(ValueError):
+            json_loads(b'{')
+
+        monkeypatch.setitem(sys.modules, 'orjson', None)
+        monkeypatch.setitem(sys.modules, 'msgspec', None)
+        assert _json_decoder() is json.loads
+
+    def test_metrics(self, wlts_objects):
+        from wlts.metrics import MetricsCollector
+
+        for k in wlts_objects:
+            responses = [httpx.Response(503, headers={'retry-after': '0'})]
+
+            def handler(request):
+                if responses:
+                    return responses.pop(0)
+                if request.url.path.endswith('describe_collection'):
+                    return httpx.Response(200, json=wlts_objects[k]['describe_collection.json'])
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            events, metrics = [], MetricsCollector(buckets=(0.1, 1.0))
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler), backoff_factor=0,
+                          hooks=[metrics, lambda event, data: events.append(event)])
+
+            s.tj(latitude=-12.0, longitude=-54.0)
+            s['prodes_cerrado']
+            s['prodes_cerrado']
+
+            assert events[:3] == ['request_start', 'retry', 'request_end']
+
+            result = metrics.to_dict()
+            assert result['requests']['trajectory']['latency']['count'] == 1
+            assert result['requests']['trajectory']['latency']['buckets']['+Inf'] == 1
+            assert result['requests']['trajectory']['retries'] == 1
+            assert result['requests']['trajectory']['status'] == {200: 1}
+            assert result['requests']['trajectory']['bytes'] > 0
+            assert result['requests']['describe_collection']['parse']['count'] == 1
+            assert result['cache']['metadata'] == {'hit': 1, 'miss': 1}
+
+            text = metrics.to_prometheus()
+            assert 'wlts_request_duration_seconds_bucket{operation="trajectory",le="+Inf"} 1' in text
+            assert 'wlts_retries_total{operation="trajectory"} 1' in text
+            assert 'wlts_cache_requests_total{cache="metadata",result="hit"} 1' in text
+
+    def test_rate_limiter(self):
+        now = [0.0]
+        limiter = wlts.transport.RateLimiter(rate=2, burst=2, timer=lambda: now[0])
+
+        assert [limiter._reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+        now[0] = 10.0
+        assert limiter._reserve() == 0.0
+
+    def test_language(self, wlts_objects):
+        for k in wlts_objects:
+            calls = []
+
+            def handler(request):
+                calls.append(request.url.path)
+                if request.url.path.endswith('trajectory'):
+                    return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+                return httpx.Response(200, json={'supported_language': [{'language': 'pt-br'}, {'language': 'en'}]})
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            s.tj(latitude=-12.0, longitude=-54.0, language='en')
+            s.tj(latitude=[-12.0, -13.0], longitude=[-54.0, -54.0], language='pt-br')
+            assert len(calls) == 4
+
+            with pytest.raises(KeyError):
+                s.tj(latitude=-12.0, longitude=-54.0, language='fr')
+            assert len(calls) == 4
+
+    def test_harmonize(self, wlts_objects, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'lccs', SimpleNamespace(LCCS=FakeLCCS))
+        for k in wlts_objects:
+            describe = dict(wlts_objects[k]['describe_collection.json'], classification_system={'id': 'mapbiomas-v5'})
+
+            def handler(request):
+                if request.url.path.endswith('describe_collection'):
+                    return httpx.Response(200, json=describe)
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            trajectory = s.tj(latitude=-12.0, longitude=-54.0, target_system='PRODES')
+
+            assert len(trajectory.trajectory) == len(wlts_objects[k]['trajectory.json']['result']['trajectory'])
+            assert all(record['class'] == 'Floresta' for record in trajectory.trajectory)
+            assert all(record['point_id'] == 1 for record in trajectory.trajectory)
+
+            FakeLCCS.calls.clear()
+            trajectories = s.tj(latitude=[-12.0, -13.0, -14.0], longitude=[-54.0] * 3, target_system='PRODES')
+
+            assert FakeLCCS.calls == []
+            for point_id, tj in enumerate(trajectories['trajectories'], start=1):
+                assert all(record['class'] == 'Floresta' for record in tj.trajectory)
+                assert all(record['point_id'] == point_id for record in tj.trajectory)
+
+    def test_harmonize_requests(self, wlts_objects, monkeypatch):
+        monkeypatch.setitem(sys.modules, 'lccs', SimpleNamespace(LCCS=FakeLCCS))
+        for k in wlts_objects:
+            describe = dict(wlts_objects[k]['describe_collection.json'], classification_system={'id': 'mapbiomas-v5'})
+            trajectory = wlts.trajectory.Trajectory(wlts_objects[k]['trajectory.json'])
+
+            transport = mock_transport(describe)
+            s = wlts.WLTS(url, transport=transport)
+
+            FakeLCCS.calls.clear()
+            first = s.harmonize(trajectory, 'PRODES')
+            assert FakeLCCS.calls == [('mapbiomas-v5', 'PRODES'), 'classes']
+            assert s.harmonize(trajectory, 'PRODES') == first
+            assert len(FakeLCCS.calls) == 2
+
+            async def harmonize():
+                async with wlts.AsyncWLTS(url, transport=transport) as service:
+                    return [await service.harmonize(trajectory, 'PRODES') for _ in range(2)]
+
+            FakeLCCS.calls.clear()
+            assert asyncio.run(harmonize()) == [first, first]
+            assert len(FakeLCCS.calls) == 2
+
+    def test_trajectory_cache(self, wlts_objects, tmp_path):
+        for k in wlts_objects:
+            calls = []
+
+            def handler(request):
+                calls.append(request.url)
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            path = str(tmp_path / f'{k}.db')
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler), trajectory_cache=path)
+
+            first = s.tj(latitude=-12.0, longitude=-54.0, collections='mapbiomas5_amazonia')
+            second = s.tj(latitude=-12, longitude=-54.0, collections=['mapbiomas5_amazonia'])
+            assert first == second
+            assert len(calls) == 1
+
+            cache = wlts.cache.TrajectoryCache(path, offline=True, read_only=True)
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler), trajectory_cache=cache)
+            assert s.tj(latitude=-12.0, longitude=-54.0, collections='mapbiomas5_amazonia') == first
+            with pytest.raises(KeyError):
+                s.tj(latitude=-13.0, longitude=-54.0, collections='mapbiomas5_amazonia')
+            assert len(calls) == 1
+
+    def test_trajectory_cache_eviction(self, tmp_path):
+        cache = wlts.cache.TrajectoryCache(str(tmp_path / 'lru.db'), max_entries=2)
+
+        for i in range(3):
+            cache.set(str(i), {'value': i})
+            time.sleep(0.01)
+        assert len(cache) == 2
+        assert cache.get('0') is None
+        assert cache.get('2') == {'value': 2}
+
+        # The hit on '2' makes '1' the least recently used entry.
+        time.sleep(0.01)
+        cache.set('3', {'value': 3})
+        assert cache.get('1') is None
+        assert len(cache) == 2
+
+        cache.close()
+        cache = wlts.cache.TrajectoryCache(str(tmp_path / 'lru.db'), max_bytes=1)
+        cache.set('4', {'value': 4})
+        assert len(cache) == 0
+
+    def test_trajectories_concurrent(self, wlts_objects):
+        for k in wlts_objects:
+            payload = wlts_objects[k]['trajectory.json']
+
+            def handler(request):
+                time.sleep(random.random() / 100)
+                query = dict(payload['query'], latitude=float(request.url.params['latitude']))
+                return httpx.Response(200, json=dict(payload, query=query))
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            latitudes = [-12.0 - i for i in range(20)]
+            result = s.tj(latitude=latitudes, longitude=[-54.0] * 20, max_workers=8)
+
+            trajectories = result['trajectories']
+            assert [tj.query['latitude'] for tj in trajectories] == latitudes
+            for point_id, tj in enumerate(trajectories, start=1):
+                assert all(record['point_id'] == point_id for record in tj.trajectory)
+
+    def test_batch_trajectories(self, wlts_objects):
+        for k in wlts_objects:
+            payload = wlts_objects[k]['trajectory.json']
+            calls = []
+
+            def handler(request):
+                calls.append(request.method)
+                if request.method == 'POST':
+                    points = json.loads(request.content)['points']
+                    return httpx.Response(200, json={'trajectories': [
+                        dict(payload, query=dict(payload['query'], **point)) for point in points
+                    ]})
+                return httpx.Response(200, json=payload)
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            latitudes = [-12.0 - i for i in range(5)]
+            result = s.tj(latitude=latitudes, longitude=[-54.0] * 5, batch_size=2, max_workers=2)
+
+            assert calls == ['POST'] * 3
+            assert [tj.query['latitude'] for tj in result['trajectories']] == latitudes
+            assert [tj.trajectory[0]['point_id'] for tj in result['trajectories']] == [1, 2, 3, 4, 5]
+
+    def test_batch_trajectories_fallback(self, wlts_objects):
+        for k in wlts_objects:
+            calls = []
+
+            def handler(request):
+                calls.append(request.method)
+                if request.method == 'POST':
+                    return httpx.Response(405)
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            result = s.tj(latitude=[-12.0, -13.0, -14.0], longitude=[-54.0] * 3, batch_size=2)
+
+            assert calls == ['POST', 'GET', 'GET', 'GET']
+            assert [tj.trajectory[0]['point_id'] for tj in result['trajectories']] == [1, 2, 3]
+
+    def test_trajectories_errors(self, wlts_objects):
+        for k in wlts_objects:
+            def handler(request):
+                if request.url.params['latitude'] == '-13.0':
+                    return httpx.Response(500)
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            with pytest.raises(httpx.HTTPStatusError):
+                s.tj(latitude=[-12.0, -13.0, -14.0], longitude=[-54.0] * 3)
+
+            result = s.tj(latitude=[-12.0, -13.0, -14.0], longitude=[-54.0] * 3, errors='collect', max_workers=2)
+
+            assert [tj.trajectory[0]['point_id'] for tj in result['trajectories']] == [1, 3]
+            assert [(e['point_id'], e['latitude']) for e in result.errors] == [(2, -13.0)]
+
+    def test_trajectories_checkpoint(self, wlts_objects, tmp_path):
+        for k in wlts_objects:
+            calls = []
+            failing = {'-13.0'}
+
+            def handler(request):
+                calls.append(request.url.params['latitude'])
+                if request.url.params['latitude'] in failing:
+                    return httpx.Response(500)
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+            path = str(tmp_path / f'{k}.jsonl')
+            latitudes = [-12.0, -13.0, -14.0]
+
+            with pytest.raises(httpx.HTTPStatusError):
+                s.tj(latitude=latitudes, longitude=[-54.0] * 3, checkpoint=path)
+
+            failing.clear()
+            calls.clear()
+            result = s.tj(latitude=latitudes, longitude=[-54.0] * 3, checkpoint=path)
+
+            assert calls == ['-13.0', '-14.0']
+            assert [tj.trajectory[0]['point_id'] for tj in result['trajectories']] == [1, 2, 3]
+
+            with pytest.raises(ValueError):
+                s.tj(latitude=[-15.0], longitude=[-54.0], checkpoint=path)
+
+            calls.clear()
+            for options in ({'collections': 'other'}, {'start_date': '2001'}, {'geometry': True}):
+                with pytest.raises(ValueError):
+                    s.tj_from(pd.DataFrame({'latitude': latitudes, 'longitude': [-54.0] * 3}),
+                              checkpoint=path, **options)
+            assert calls == []
+
+            # Identifiers zipped from dataframe columns are NumPy scalars.
+            path = str(tmp_path / f'{k}-numpy.jsonl')
+            points = [(-12.0, -54.0, np.int64(3))]
+            assert [tj.trajectory[0]['point_id'] for tj in s.iter_trajectories(points, checkpoint=path)] == [3]
+            calls.clear()
+            assert [tj.trajectory[0]['point_id'] for tj in s.iter_trajectories(points, checkpoint=path)] == [3]
+            assert calls == []
+
+    def test_trajectories_deduplicate(self, wlts_objects):
+        for k in wlts_objects:
+            calls = []
+
+            def handler(request):
+                if request.url.path.endswith('describe_collection'):
+                    return httpx.Response(200, json=dict(wlts_objects[k]['describe_collection.json'],
+                                                         spatial_resolution={'x': 0.5, 'y': 0.5, 'unit': 'degree'}))
+                calls.append((request.url.params['latitude'], request.url.params['longitude']))
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            result = s.tj(latitude=[-12.0, -13.0, -12.0], longitude=[-54.0, -54.0, -54.0], deduplicate=True)
+            assert len(calls) == 2
+            assert [tj.trajectory[0]['point_id'] for tj in result['trajectories']] == [1, 2, 3]
+            assert result['trajectories'][0].trajectory == [
+                dict(record, point_id=1) for record in result['trajectories'][2].trajectory
+            ]
+
+            calls.clear()
+            result = s.tj(latitude=[-12.1, -12.2, -12.9], longitude=[-54.1, -54.2, -54.1], snap=0.5)
+            assert calls == [('-12.25', '-54.25'), ('-12.75', '-54.25')]
+            assert len(result['trajectories']) == 3
+
+            calls.clear()
+            s.tj(latitude=[-12.1, -12.2], longitude=[-54.1, -54.2], snap='prodes_cerrado')
+            assert len(calls) == 1
+
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['describe_collection.json']))
+            with pytest.raises(ValueError):
+                s.tj(latitude=[-12.1], longitude=[-54.1], snap='prodes_cerrado')
+
+            describe = wlts_objects[k]['describe_collection.json']
+            for resolution in (30, {'x': 30, 'y': 30}, {'x': 30, 'y': 30, 'unit': 'meter'}):
+                with pytest.raises(ValueError):
+                    s.tj(latitude=[-12.1], longitude=[-54.1], snap=dict(describe, spatial_resolution=resolution))
+
+    def test_trajectories_df(self, wlts_objects):
+        for k in wlts_objects:
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+
+            trajectories = s.tj(latitude=[-12.0, -13.0], longitude=[-54.0, -54.0])
+            df = trajectories.df()
+            records = wlts_objects[k]['trajectory.json']['result']['trajectory']
+
+            assert list(df.columns) == ['class', 'collection', 'date', 'point_id']
+            assert len(df) == 2 * len(records)
+            assert list(df['point_id']) == [1] * len(records) + [2] * len(records)
+            assert df['class'].dtype == 'category'
+            assert df['collection'].dtype == 'category'
+            assert trajectories.df(categorical=False).equals(
+                pd.concat([tj.df() for tj in trajectories['trajectories']], ignore_index=True))
+
+    def test_compact(self, wlts_objects):
+        for k in wlts_objects:
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+
+            trajectories = s.tj(latitude=[-12.0, -13.0], longitude=[-54.0, -54.0])
+            compact = trajectories.compact()
+            records = [record for tj in trajectories['trajectories'] for record in tj.trajectory]
+
+            assert len(compact) == len(records)
+            assert compact.trajectory == records
+            assert compact.collections == ['mapbiomas5_amazonia']
+            assert compact.df().astype(str).equals(trajectories.df().astype(str))
+
+            streamed = wlts.compact.CompactTrajectories.from_trajectories(
+                s.iter_trajectories([(-12.0, -54.0), (-13.0, -54.0)]))
+            assert list(streamed) == records
+
+    def test_geodf(self, wlts_objects):
+        for k in wlts_objects:
+            pixel = {'type': 'Polygon', 'coordinates': [[[-54.0, -12.0], [-53.9, -12.0], [-53.9, -11.9], [-54.0, -12.0]]]}
+            payload = json.loads(json.dumps(wlts_objects[k]['trajectory.json']))
+            for record in payload['result']['trajectory']:
+                record['geom'] = pixel
+
+            s = wlts.WLTS(url, transport=mock_transport(payload))
+
+            gdf = s.tj(latitude=-12.0, longitude=-54.0, geometry=True).geodf()
+            assert gdf.crs == 'EPSG:4326'
+            assert gdf.geometry.name == 'geom'
+            assert all(geom.equals(shape(pixel)) for geom in gdf.geometry)
+
+            gdf = s.tj(latitude=[-12.0, -13.0], longitude=[-54.0, -54.0], geometry=True).geodf()
+            assert len(gdf) == 2 * len(payload['result']['trajectory'])
+            assert set(gdf['point_id']) == {1, 2}
+
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+            with pytest.raises(RuntimeError):
+                s.tj(latitude=[-12.0], longitude=[-54.0]).geodf()
+
+    def test_iter_trajectories(self, wlts_objects):
+        for k in wlts_objects:
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+
+            points = ((-12.0 - i, -54.0) for i in range(5))
+            chunks = list(s.iter_trajectories(points, chunk_size=2, max_workers=2))
+
+            assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+            assert [tj.trajectory[0]['point_id'] for chunk in chunks for tj in chunk] == [1, 2, 3, 4, 5]
+
+            with pytest.raises(ValueError):
+                list(s.iter_trajectories([(-12.0, -54.0), (-100.0, -54.0)]))
+
+    def test_tj_from(self, wlts_objects, tmp_path):
+        import geopandas as gpd
+
+        csv = tmp_path / 'points.csv'
+        csv.write_text('id,lat,lon\nA,-12.0,-54.0\nB,-12.5,-54.5\nC,-13.0,-55.0\n')
+
+        for k in wlts_objects:
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+
+            tj = s.tj_from(csv, latitude='lat', longitude='lon', point_id='id', max_workers=2)
+
+            assert [t.trajectory[0]['point_id'] for t in tj['trajectories']] == ['A', 'B', 'C']
+            assert tj.compact().df().point_id.unique().tolist() == ['A', 'B', 'C']
+
+            gdf = gpd.GeoDataFrame({'id': [7, 8]}, geometry=gpd.points_from_xy([-54.0, -55.0], [-12.0, -13.0]),
+                                   crs='EPSG:4326')
+            tj = s.tj_from(gdf.to_crs('EPSG:3857'), point_id='id')
+
+            assert [t.trajectory[0]['point_id'] for t in tj['trajectories']] == [7, 8]
+
+            with pytest.raises(ValueError):
+                s.tj_from(pd.DataFrame({'latitude': [-12.0, 95.0], 'longitude': [-54.0, -54.0]}))
+
+    def test_tj_from_errors(self, wlts_objects):
+        ids = ['Z', 'Y', 'X', 'W', 'V', 'U', 'T', 'S']
+        df = pd.DataFrame({'id': ids, 'latitude': [-12.0 - i for i in range(8)], 'longitude': [-54.0] * 8})
+
+        for k in wlts_objects:
+            def handler(request):
+                # The first points take longer, so they fail after the others.
+                latitude = float(request.url.params['latitude'])
+                time.sleep(0.01 * (20 + latitude))
+                if latitude <= -14.0 and latitude != -17.0:
+                    return httpx.Response(500)
+                return httpx.Response(200, json=wlts_objects[k]['trajectory.json'])
+
+            transport = httpx.MockTransport(handler)
+            s = wlts.WLTS(url, transport=transport, retries=0)
+
+            tj = s.tj_from(df, point_id='id', max_workers=8, errors='collect')
+
+            assert [t.trajectory[0]['point_id'] for t in tj['trajectories']] == ['Z', 'Y', 'U']
+            assert [error['point_id'] for error in tj['errors']] == ['X', 'W', 'V', 'T', 'S']
+
+            async def main():
+                async with wlts.AsyncWLTS(url, transport=transport, retries=0) as service:
+                    return await service.tj_from(df, point_id='id', max_workers=8, errors='collect')
+
+            assert [error['point_id'] for error in asyncio.run(main())['errors']] == ['X', 'W', 'V', 'T', 'S']
+
+    def test_tj_from_duplicate_ids(self, wlts_objects, tmp_path):
+        df = pd.DataFrame({'id': ['a', 'a'], 'latitude': [-12.0, -13.0], 'longitude': [-54.0, -54.0]})
+
+        for k in wlts_objects:
+            calls = []
+
+            def handler(request):
+                if request.method == 'POST':
+                    points = json.loads(request.content)['points']
+                    calls.extend(point['latitude'] for point in points)
+                    documents = [dict(wlts_objects[k]['trajectory.json'], query=point) for point in points]
+                    return httpx.Response(200, json={'trajectories': documents})
+                calls.append(float(request.url.params['latitude']))
+                return httpx.Response(200, json=dict(wlts_objects[k]['trajectory.json'],
+                                                     query=dict(request.url.params)))
+
+            s = wlts.WLTS(url, transport=httpx.MockTransport(handler))
+
+            tj = s.tj_from(df, point_id='id', batch_size=10)
+            assert [float(t['query']['latitude']) for t in tj['trajectories']] == [-12.0, -13.0]
+            assert [t.trajectory[0]['point_id'] for t in tj['trajectories']] == ['a', 'a']
+
+            path = str(tmp_path / f'{k}.jsonl')
+            s.tj_from(df, point_id='id', checkpoint=path)
+            calls.clear()
+            tj = s.tj_from(df, point_id='id', checkpoint=path)
+            assert calls == []
+            assert [float(t['query']['latitude']) for t in tj['trajectories']] == [-12.0, -13.0]
+
+    def test_to_parquet(self, wlts_objects, tmp_path):
+        pq = pytest.importorskip('pyarrow.parquet')
+        import pyarrow as pa
+
+        from wlts.writer import write_trajectories
+
+        for k in wlts_objects:
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+            tj = s.tj(latitude=[-12.0, -12.5, -13.0], longitude=[-54.0, -54.5, -55.0])
+            size = len(tj.df())
+
+            assert tj.to_parquet(tmp_path / 'tj.parquet', row_group_size=5) == size
+
+            file = pq.ParquetFile(tmp_path / 'tj.parquet')
+            table = file.read()
+
+            assert file.num_row_groups == -(-size // 5)
+            assert pa.types.is_dictionary(table.schema.field('class').type)
+            assert table.to_pandas()['class'].astype(str).tolist() == tj.df()['class'].astype(str).tolist()
+
+            assert tj.to_arrow(tmp_path / 'tj.arrow', row_group_size=5) == size
+            assert pa.ipc.open_file(tmp_path / 'tj.arrow').read_all().column('point_id').to_pylist() == \
+                tj.df().point_id.tolist()
+
+            points = ((-12.0 - i, -54.0) for i in range(3))
+            assert write_trajectories(s.iter_trajectories(points), tmp_path / 'stream.feather') == size
+
+    def test_to_geoparquet(self, wlts_objects, tmp_path):
+        pytest.importorskip('pyarrow')
+        import geopandas as gpd
+
+        for k in wlts_objects:
+            pixel = {'type': 'Polygon', 'coordinates': [[[-54.0, -12.0], [-53.9, -12.0], [-53.9, -11.9], [-54.0, -12.0]]]}
+            payload = json.loads(json.dumps(wlts_objects[k]['trajectory.json']))
+            for record in payload['result']['trajectory']:
+                record['geom'] = pixel
+
+            s = wlts.WLTS(url, transport=mock_transport(payload))
+            tj = s.tj(latitude=[-12.0, -12.5], longitude=[-54.0, -54.5], geometry=True)
+
+            tj.to_parquet(tmp_path / 'tj.parquet', geometry=True)
+            gdf = gpd.read_parquet(tmp_path / 'tj.parquet')
+
+            assert gdf.geometry.name == 'geom'
+            assert gdf.geom.geom_equals(tj.geodf().geom).all()
+
+            s = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+            with pytest.raises(RuntimeError):
+                s.tj(latitude=[-12.0], longitude=[-54.0]).to_parquet(tmp_path / 'none.parquet', geometry=True)
+
+
+class TestAsyncWLTS:
+
+    def test_collections(self, wlts_objects):
+        for k in wlts_objects:
+            async def main():
+                transport = mock_transport(wlts_objects[k]['list_collections.json'])
+                async with wlts.AsyncWLTS(url, transport=transport) as s:
+                    return await s.collections()
+
+            assert asyncio.run(main()) == wlts_objects[k]['list_collections.json']['collections']
+
+    def test_describe(self, wlts_objects):
+        for k in wlts_objects:
+            async def main():
+                transport = mock_transport(wlts_objects[k]['describe_collection.json'])
+                async with wlts.AsyncWLTS(url, transport=transport) as s:
+                    return await s.describe('prodes_cerrado')
+
+            collection = asyncio.run(main())
+
+            assert collection == wlts_objects[k]['describe_collection.json']
+            assert collection.name == 'prodes_cerrado'
+
+    def test_trajectory(self, wlts_objects):
+        for k in wlts_objects:
+            async def main():
+                transport = mock_transport(wlts_objects[k]['trajectory.json'])
+                async with wlts.AsyncWLTS(url, transport=transport) as s:
+                    single = await s.tj(latitude=-12.0, longitude=-54.0)
+                    multiple = await s.tj(latitude=[-12.0, -13.0], longitude=[-54.0, -54.0], max_workers=2)
+                return single, multiple
+
+            single, multiple = asyncio.run(main())
+
+            assert isinstance(single, wlts.trajectory.Trajectory)
+            assert 'trajectory' in single['result']
+            assert [tj.trajectory[0]['point_id'] for tj in multiple['trajectories']] == [1, 2]
+
+    def test_iter_trajectories(self, wlts_objects):
+        for k in wlts_objects:
+            async def main():
+                transport = mock_transport(wlts_objects[k]['trajectory.json'])
+                async with wlts.AsyncWLTS(url, transport=transport) as s:
+                    points = ((-12.0 - i, -54.0) for i in range(3))
+                    return [tj async for tj in s.iter_trajectories(points, max_workers=2)]
+
+            result = asyncio.run(main())
+
+            assert [tj.trajectory[0]['point_id'] for tj in result] == [1, 2, 3]
+
 
 class TestCli:
-    def test_collection(self, wlts_objects, requests_mock, runner, config_obj):
+    def test_collection(self, wlts_objects, runner, config_obj):
         for k in wlts_objects:
-            requests_mock.get(match_url, json=wlts_objects[k]['list_collections.json'],
-                              status_code=200,
-                              headers={'content-type': 'application/json'})
+            config_obj.service = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['list_collections.json']))
 
             result = runner.invoke(wlts.cli.list_collections, obj=config_obj)
 
             assert result.exit_code == 0
             assert 'prodes_amz' in result.output
 
-    def test_describe(self, wlts_objects, requests_mock, runner, config_obj):
+    def test_describe(self, wlts_objects, runner, config_obj):
         for k in wlts_objects:
-            requests_mock.get(match_url, json=wlts_objects[k]['describe_collection.json'],
-                              status_code=200,
-                              headers={'content-type': 'application/json'})
+            config_obj.service = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['describe_collection.json']))
 
             result = runner.invoke(wlts.cli.describe, ['--collection', 'prodes_cerrado'], obj=config_obj)
 
@@ -149,11 +893,9 @@ class TestCli:
             assert 'detail' in result.output
             assert 'name' in result.output
 
-    def test_trajectory(self, wlts_objects, requests_mock, runner, config_obj):
+    def test_trajectory(self, wlts_objects, runner, config_obj):
         for k in wlts_objects:
-            requests_mock.get(match_url, json=wlts_objects[k]['trajectory.json'],
-                              status_code=200,
-                              headers={'content-type': 'application/json'})
+            config_obj.service = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
 
             result = runner.invoke(wlts.cli.trajectory, ['--collections', 'mapbiomas5_amazonia',
                                                          '--latitude', '-12.0',
@@ -165,6 +907,37 @@ class TestCli:
             assert result.exit_code == 0
             assert 'Processing trajectory request...' in result.output
 
+    def test_batch_trajectory(self, wlts_objects, runner, config_obj, tmp_path):
+        for k in wlts_objects:
+            config_obj.service = wlts.WLTS(url, transport=mock_transport(wlts_objects[k]['trajectory.json']))
+            size = len(wlts_objects[k]['trajectory.json']['result']['trajectory'])
+
+            points = 'id,lat,lon\nA,-12.0,-54.0\nB,-12.5,-54.5\n'
+            result = runner.invoke(wlts.cli.batch_trajectory,
+                                   ['--latitude-column', 'lat', '--longitude-column', 'lon', '--id-column', 'id',
+                                    '--format', 'ndjson', '--max-workers', '2'],
+                                   input=points, obj=config_obj)
+
+            assert result.exit_code == 0, result.output
+            records = [json.loads(line) for line in result.stdout.splitlines()]
+            assert len(records) == 2 * size
+            assert [r['point_id'] for r in records] == ['A'] * size + ['B'] * size
+
+            (tmp_path / 'points.csv').write_text('latitude,longitude\n-12.0,-54.0\n')
+            output = tmp_path / 'out.csv'
+            result = runner.invoke(wlts.cli.batch_trajectory, ['-i', str(tmp_path / 'points.csv'), '-o', str(output)],
+                                   obj=config_obj)
+
+            assert result.exit_code == 0, result.output
+            df = pd.read_csv(output)
+            assert len(df) == size and set(df.point_id) == {1}
+
+            config_obj.service = wlts.WLTS(url, transport=mock_transport({}, status_code=404), retries=0)
+            result = runner.invoke(wlts.cli.batch_trajectory, ['-i', str(tmp_path / 'points.csv'), '-o', str(output),
+                                                               '--errors', 'collect'], obj=config_obj)
+            assert result.exit_code == 0, result.output
+            assert '1 failed' in result.output
+
 
 if __name__ == '__main__':
     import pytest
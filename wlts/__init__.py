@@ -18,8 +18,18 @@
 
 """Python Client Library for the Web Land Trajectory Service."""
 
-from . import cli
+import importlib
+
+from .async_wlts import AsyncWLTS
 from .version import __version__
 from .wlts import WLTS
 
-__all__ = ('__version__', 'WLTS',)
+__all__ = ('__version__', 'WLTS', 'AsyncWLTS',)
+
+
+def __getattr__(name):
+    """Import the command line interface, and its dependencies, on first use."""
+    if name == 'cli':
+        return importlib.import_module('.cli', __name__)
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
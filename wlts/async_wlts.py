@@ -0,0 +1,569 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Asynchronous Python Client Library for WLTS.
+
+This module introduces a class named ``AsyncWLTS`` that can be used to retrieve
+trajectories for a given location from an :mod:`asyncio` application.
+"""
+import asyncio
+from collections import deque
+
+import httpx
+
+from .base import _BATCH_UNSUPPORTED, BaseWLTS, _validate_lat_long
+from .collection import Collections
+from .trajectories import Trajectories
+from .trajectory import Trajectory
+from .transport import AsyncRetryTransport
+
+
+async def _aiter(iterable):
+    """Iterate asynchronously over a synchronous or an asynchronous iterable."""
+    if hasattr(iterable, "__aiter__"):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+async def _aenumerate(iterable):
+    """Number the items of an asynchronous iterable from 0, as ``enumerate``."""
+    position = 0
+
+    async for item in iterable:
+        yield position, item
+        position += 1
+
+
+async def _achunks(iterable, size):
+    """Split an asynchronous iterable into lists with up to ``size`` items."""
+    chunk = []
+
+    async for item in iterable:
+        chunk.append(item)
+
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+async def _aharmonized(service, trajectories, target_system):
+    """Harmonize each trajectory of an asynchronous stream."""
+    async for tj in trajectories:
+        yield await service.harmonize(tj, target_system)
+
+
+class AsyncWLTS(BaseWLTS):
+    """This class implement an asynchronous client for WLTS.
+
+    It accepts the same arguments as :class:`wlts.WLTS` and returns the same
+    result objects, but its operations are coroutines that must be awaited.
+
+    .. note::
+        For more information about WLTS, please, refer to
+        `WLTS specification <https://github.com/brazil-data-cube/wlts-spec>`_.
+    """
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Return the HTTP client used to communicate with the WLTS server.
+
+        The client is created on first use and reused by all subsequent requests.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                **self._http_client_options(AsyncRetryTransport, httpx.AsyncHTTPTransport)
+            )
+
+        return self._client
+
+    async def aclose(self):
+        """Close the HTTP client and release the pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        """Enter the runtime context of the WLTS client."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """Close the WLTS client when leaving the runtime context."""
+        await self.aclose()
+
+    async def collections(self):
+        """Return a list of collections names.
+
+        Returns:
+            list: A list with the names of available collections in the service.
+        """
+        return await self._list_collections()
+
+    async def describe(self, collection_id):
+        """Get the collection whose name is identified by ``collection_id``.
+
+        Returns:
+            Collection: A collection metadata object.
+        """
+        cv_meta = await self._describe_collection(collection_id)
+
+        return Collections(service=self, metadata=cv_meta)
+
+    async def describe_many(self, names, max_workers=None):
+        """Get the metadata of several collections, retrieving them concurrently.
+
+        Args:
+            names (list): The collection names.
+            max_workers (:obj:`int`, optional): The maximum number of requests in flight. By default, all at once.
+
+        Returns:
+            list: A :class:`wlts.collection.Collections` for each name, in the order of the names.
+        """
+        if not max_workers:
+            return list(await asyncio.gather(*(self.describe(name) for name in names)))
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def describe(name):
+            async with semaphore:
+                return await self.describe(name)
+
+        return list(await asyncio.gather(*(describe(name) for name in names)))
+
+    async def describe_all(self, max_workers=None):
+        """Get the metadata of all the collections available in the service, retrieving them concurrently.
+
+        Returns:
+            list: A :class:`wlts.collection.Collections` for each collection, in the order of :meth:`collections`.
+        """
+        return await self.describe_many(await self.collections(), max_workers)
+
+    async def __aiter__(self):
+        """Iterate over collections available in the service.
+
+        The collection descriptions are retrieved concurrently with :meth:`describe_all`.
+
+        Returns:
+            A collection at each iteration.
+        """
+        for collection in await self.describe_all():
+            yield collection
+
+    async def _support_language(self, refresh=False):
+        """Returns the languages supported by the service.
+
+        The languages are retrieved from the service root on first use and
+        kept in the metadata cache.
+
+        Args:
+            refresh (bool): Retrieve the languages from the service even if they are cached.
+        """
+        languages = None if refresh else self._cache_get(("supported_language",))
+
+        if languages is None:
+            data = await self._get(self._url, op="")
+            languages = self._language_enum(data)
+            self._cache.set(("supported_language",), languages)
+
+        return languages
+
+    async def tj(self, latitude, longitude, max_workers=None, batch_size=None, errors="raise", checkpoint=None,
+                 deduplicate=False, snap=None, **options):
+        """Retrieve the trajectory for a given location and time interval.
+
+        See :meth:`wlts.WLTS.tj` for the description of the arguments. When
+        ``latitude`` and ``longitude`` are lists, all the points are requested
+        concurrently unless ``max_workers`` limits the number of requests in flight.
+
+        Returns:
+            Trajectory: A trajectory object as a dictionary.
+
+        Example:
+
+            Retrieves a trajectory:
+
+            .. doctest::
+                :skipif: WLTS_EXAMPLE_URL is None
+
+                >>> import asyncio
+                >>> from wlts import *
+                >>> async def main():
+                ...     async with AsyncWLTS(WLTS_EXAMPLE_URL) as service:
+                ...         return await service.tj(latitude=-12.0, longitude=-54.0, collections='mapbiomas-v6')
+                >>> tj = asyncio.run(main())
+        """
+        self._check_options(options)
+
+        if "language" in options:
+            self._check_language(options["language"], await self._support_language())
+
+        if type(latitude) != list and type(longitude) != list:
+            _validate_lat_long(latitude, longitude)
+
+            trajectory = Trajectory(await self._point_trajectory(latitude, longitude, 1, **options))
+
+            if "target_system" in options:
+                return await self.harmonize(trajectory, options["target_system"])
+
+            return trajectory
+
+        points = list(zip(latitude, longitude))
+
+        for lat, long in points:
+            _validate_lat_long(lat, long)
+
+        failures, on_error = self._error_collector(errors)
+
+        query_points, owners = points, None
+
+        if deduplicate or snap is not None:
+            grid = self._grid(await self.describe(snap) if isinstance(snap, str) else snap)
+            query_points, owners = self._distinct_points(points, grid)
+
+        with self._open_checkpoint(checkpoint, options) as cp:
+            # Without a limit, all the points are requested at once.
+            result = [
+                tj async for tj in self._iter_points(
+                    _aiter(enumerate(query_points, start=1)), max_workers or len(query_points), options,
+                    batch_size, cp, on_error
+                )
+            ]
+
+        if owners is not None:
+            result, failures = self._fan_out(points, owners, result, failures)
+
+        result = Trajectories({"trajectories": result})
+
+        if errors == "collect":
+            result["errors"] = sorted(failures, key=lambda failure: failure["point_id"])
+
+        if "target_system" in options:
+            return await self.harmonize(result, options["target_system"])
+
+        return result
+
+    async def iter_trajectories(self, points, chunk_size=None, max_workers=None, batch_size=None, on_error=None,
+                                checkpoint=None, **options):
+        """Retrieve the trajectories of a sequence of locations as an asynchronous stream.
+
+        See :meth:`wlts.WLTS.iter_trajectories` for the description of the
+        arguments. ``points`` may also be an asynchronous iterable.
+
+        Returns:
+            AsyncIterator[Trajectory]: The trajectory of each point, in the order of the points.
+        """
+        async def identified(points):
+            index = 0
+
+            async for lat, long, *point_id in _aiter(points):
+                index += 1
+                _validate_lat_long(lat, long)
+                yield (point_id[0] if point_id else index), (lat, long)
+
+        async for item in self._stream(identified(points), chunk_size, max_workers, batch_size, on_error,
+                                       checkpoint, options):
+            yield item
+
+    async def tj_from(self, source, latitude="latitude", longitude="longitude", point_id=None, max_workers=None,
+                      batch_size=None, errors="raise", checkpoint=None, **options):
+        """Retrieve the trajectories of the points read from a file or a dataframe.
+
+        See :meth:`wlts.WLTS.tj_from` for the description of the arguments.
+
+        Returns:
+            Trajectories: The trajectories of the points, in the order of the source.
+        """
+        from .points import read_points
+
+        failures, on_error = self._error_collector(errors)
+
+        positions = dict()
+        points = _aiter(self._numbered(
+            self._identified(read_points(source, latitude, longitude, point_id), validate=False), positions
+        ))
+
+        result = Trajectories({"trajectories": [
+            tj async for tj in self._stream(points, None, max_workers, batch_size, on_error, checkpoint, options)
+        ]})
+
+        if errors == "collect":
+            # The points fail in the order their requests finish: report them in the order of the source.
+            result["errors"] = sorted(failures, key=lambda failure: positions[failure["point_id"]])
+
+        return result
+
+    async def _stream(self, points, chunk_size, max_workers, batch_size, on_error, checkpoint, options):
+        """Retrieve the trajectories of an asynchronous iterable of ``(point_id, (latitude, longitude))`` items."""
+        self._check_options(options)
+
+        if "language" in options:
+            self._check_language(options["language"], await self._support_language())
+
+        with self._open_checkpoint(checkpoint, options) as cp:
+            result = self._iter_points(points, max_workers, options, batch_size, cp, on_error)
+
+            if "target_system" in options:
+                result = _aharmonized(self, result, options["target_system"])
+
+            if chunk_size:
+                result = _achunks(result, chunk_size)
+
+            async for item in result:
+                yield item
+
+    async def _iter_points(self, points, max_workers, options, batch_size=None, checkpoint=None, on_error=None):
+        """Retrieve the trajectories of ``(point_id, (latitude, longitude))`` items, keeping their order.
+
+        With ``batch_size``, the points are packed into batch requests. At most
+        ``max_workers`` requests are in flight at any time. See
+        :meth:`wlts.WLTS._iter_points` for ``checkpoint`` and ``on_error``.
+        """
+        async def fetch(chunk):
+            result, missing = self._restore(checkpoint, chunk)
+            points = [item for _, item in missing]
+
+            try:
+                if not points:
+                    fetched = []
+                elif batch_size:
+                    fetched = await self._batch_trajectories(points, options)
+                else:
+                    fetched = [
+                        Trajectory(await self._point_trajectory(lat, long, point_id, **options))
+                        for point_id, (lat, long) in points
+                    ]
+            except Exception as e:
+                if on_error is None:
+                    raise
+
+                for point_id, point in points:
+                    on_error(point_id, point, e)
+
+                missing, fetched = [], []
+
+            self._record(checkpoint, missing, fetched, result)
+
+            return [result[position] for position, _ in chunk if position in result]
+
+        # Key each point by its position in the run, as the identifiers given by the caller may repeat.
+        tasks = _achunks(_aenumerate(points), batch_size or 1)
+
+        window = max(max_workers or 1, 1)
+        pending = deque()
+
+        try:
+            async for task in tasks:
+                pending.append(asyncio.ensure_future(fetch(task)))
+
+                if len(pending) >= window:
+                    for tj in await pending.popleft():
+                        yield tj
+
+            while pending:
+                for tj in await pending.popleft():
+                    yield tj
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _point_trajectory(self, latitude, longitude, point_id, **options):
+        """Retrieve the trajectory of a single location and tag its records with the point identifier."""
+        data = await self._trajectory(
+            **{"latitude": latitude, "longitude": longitude, **self._query_options(options)}
+        )
+
+        return self._stamp(data, point_id)
+
+    async def _batch_trajectories(self, chunk, options):
+        """Retrieve the trajectories of a list of ``(point_id, (latitude, longitude))`` items.
+
+        See :meth:`wlts.WLTS._batch_trajectories`.
+        """
+        if self._batch_supported is not False:
+            try:
+                documents = await self._trajectories([point for _, point in chunk], **self._query_options(options))
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in _BATCH_UNSUPPORTED:
+                    raise
+
+                self._batch_supported = False
+            else:
+                self._batch_supported = True
+
+                return [Trajectory(self._stamp(data, index)) for (index, _), data in zip(chunk, documents)]
+
+        return [
+            Trajectory(await self._point_trajectory(lat, long, index, **options)) for index, (lat, long) in chunk
+        ]
+
+    async def harmonize(self, trajectories, target_system):
+        """Harmonize trajectories into a target classification system.
+
+        See :meth:`wlts.WLTS.harmonize` for the description of the arguments.
+        """
+        items = trajectories["trajectories"] if isinstance(trajectories, Trajectories) else [trajectories]
+        collections = {record["collection"] for tj in items for record in tj.trajectory}
+
+        lookup = await self._harmonize_lookup(collections, target_system)
+
+        return self._harmonized(trajectories, lookup)
+
+    async def _harmonize_lookup(self, collections, target_system):
+        """Build the class lookup table of the given collections into the target system."""
+        mappings = dict()
+
+        for i in collections:
+            mappings[i] = await self._mappings(i, target_system)
+
+        return self._mapping_lookup(mappings)
+
+    async def _mappings(self, collection_id, target_system):
+        """Return the class pairs of the LCCS mappings from the classification system of a collection into the target system.
+
+        The pairs are kept in the metadata cache, indexed by the source and target systems.
+        """
+        ds = await self._describe_collection(collection_id)
+        system_source = f"{ds['classification_system']['id']}"
+
+        mappings = self._cache_get(("mappings", system_source, target_system))
+
+        if mappings is None:
+            # The LCCS client is synchronous: keep it out of the event loop.
+            loop = asyncio.get_running_loop()
+            mappings = await loop.run_in_executor(None, lambda: self._class_pairs(self._lccs_service.mappings(
+                system_source=system_source,
+                system_target=target_system,
+            )))
+            self._cache.set(("mappings", system_source, target_system), mappings)
+
+        return mappings
+
+    async def _list_collections(self):
+        """Return the list of available collections."""
+        result = self._cache_get(("list_collections",))
+
+        if result is None:
+            result = await self._get(self._url, op="list_collections")
+            self._cache.set(("list_collections",), result)
+
+        return list(result["collections"])
+
+    async def _trajectory(self, **params):
+        """Retrieve the trajectories of collections associated with a given location in space."""
+        key, data = self._cached_trajectory(params)
+
+        if data is None:
+            data = await self._get(self._url, op="trajectory", **params)
+
+            if key is not None:
+                await self._cache_trajectories([(key, data)])
+
+        return data
+
+    async def _trajectories(self, points, **params):
+        """Retrieve the trajectories of many locations with a single batch request.
+
+        See :meth:`wlts.WLTS._trajectories`.
+        """
+        keys, documents = [], []
+
+        for lat, long in points:
+            key, data = self._cached_trajectory({"latitude": lat, "longitude": long, **params})
+            keys.append(key)
+            documents.append(data)
+
+        missing = [i for i, data in enumerate(documents) if data is None]
+
+        if missing:
+            body = self._batch_body([points[i] for i in missing], params)
+            result = self._batch_documents(await self._post(self._url, op="trajectory", body=body), len(missing))
+
+            for i, data in zip(missing, result):
+                documents[i] = data
+
+            if self._trajectory_cache is not None:
+                await self._cache_trajectories([(keys[i], documents[i]) for i in missing])
+
+        return documents
+
+    async def _cache_trajectories(self, items):
+        """Store trajectory documents in the persistent cache without blocking the event loop.
+
+        The lookups are left on the event loop: a cache hit only reads the database.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._trajectory_cache.set_many, items)
+
+    async def _describe_collection(self, collection_id):
+        """Describe a give collection.
+
+        :param collection_id: The collection name.
+        :type collection_id: str.
+
+        :returns: Collection description.
+        :rtype: dict
+        """
+        result = self._cache_get(("describe_collection", collection_id))
+
+        if result is None:
+            result = await self._get(
+                self._url, op="describe_collection", collection_id=collection_id
+            )
+            self._cache.set(("describe_collection", collection_id), result)
+
+        return result
+
+    def __str__(self):
+        """Return the string representation of the AsyncWLTS object."""
+        text = f"AsyncWLTS:\n\tURL: {self._url}"
+
+        return text
+
+    def __repr__(self):
+        """Return the AsyncWLTS object representation."""
+        text = f'async_wlts(url="{self._url}")'
+
+        return text
+
+    async def _get(self, url, op, **params):
+        """Query the WLTS service using HTTP GET verb and return the result as a JSON document.
+
+        :raises ValueError: If the response body does not contain a valid json.
+        """
+        url, params = self._request(op, params)
+
+        with self._observe(op, "GET", url) as call:
+            response = call["response"] = await self.client.get(url, params=params, headers=self._headers)
+
+        return self._parse(response, op)
+
+    async def _post(self, url, op, body, **params):
+        """Query the WLTS service using HTTP POST verb with a JSON body and return the result as a JSON document.
+
+        :raises ValueError: If the response body does not contain a valid json.
+        """
+        url, params = self._request(op, params)
+
+        with self._observe(op, "POST", url) as call:
+            response = call["response"] = await self.client.post(url, params=params, json=body, headers=self._headers)
+
+        return self._parse(response, op)
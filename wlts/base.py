@@ -0,0 +1,875 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Base implementation shared by the WLTS clients.
+
+This module introduces a class named ``BaseWLTS`` with the state, validation
+and result handling shared by the synchronous and asynchronous clients.
+"""
+import math
+import time
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Dict
+
+import httpx
+
+from .cache import TrajectoryCache, TTLCache
+from .checkpoint import Checkpoint
+from .trajectories import Trajectories
+from .trajectory import Trajectory
+from .transport import RateLimiter
+from .utils import json_loads
+
+
+def _validate_lat_long(lat, long):
+    """Check if the given location is a valid EPSG:4326 coordinate."""
+    if (type(lat) not in (float, int)) or (type(long) not in (float, int)):
+        raise ValueError("Arguments latitude and longitude must be numeric.")
+
+    if (lat < -90.0) or (lat > 90.0):
+        raise ValueError("latitude is out-of range [-90,90]!")
+
+    if (long < -180.0) or (long > 180.0):
+        raise ValueError("longitude is out-of range [-180,180]!")
+
+
+#: Options of httpx.Client that configure its default transport.
+_TRANSPORT_OPTIONS = ("verify", "cert", "trust_env", "http1", "proxy")
+
+#: HTTP status codes meaning that the server has no batch trajectory endpoint.
+_BATCH_UNSUPPORTED = (404, 405, 415, 501)
+
+
+def _chunks(iterable, size):
+    """Split an iterable into lists with up to ``size`` items."""
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def _pixel_grid(resolution, origin=(-180.0, 90.0)):
+    """Return a function that snaps ``(latitude, longitude)`` to the center of its pixel in a regular grid.
+
+    Args:
+        resolution (float or tuple): The pixel size, in degrees, or a ``(x, y)`` pair of sizes.
+        origin (tuple): The ``(longitude, latitude)`` of the upper left corner of the grid.
+    """
+    res_x, res_y = resolution if isinstance(resolution, (tuple, list)) else (resolution, resolution)
+    origin_x, origin_y = origin
+
+    if res_x <= 0 or res_y <= 0:
+        raise ValueError("The pixel resolution must be positive!")
+
+    def snap(lat, long):
+        col = math.floor((long - origin_x) / res_x)
+        row = math.floor((origin_y - lat) / res_y)
+
+        # Round to avoid distinct keys for the same pixel due to floating point noise.
+        return round(origin_y - (row + 0.5) * res_y, 12), round(origin_x + (col + 0.5) * res_x, 12)
+
+    return snap
+
+
+def _collection_grid(collection):
+    """Return the pixel grid of a collection, from its spatial extent and resolution metadata.
+
+    The metadata must hold a ``spatial_resolution`` such as ``{"x": 0.00025, "y": 0.00025, "unit": "degree"}``,
+    or ``{"value": 0.00025, "unit": "degree"}``. A resolution without its unit is not assumed to be in degrees.
+
+    Raises:
+        ValueError: If the collection metadata has no spatial resolution in degrees.
+    """
+    name = collection.get("name")
+    resolution = collection.get("spatial_resolution")
+
+    if not isinstance(resolution, dict) or not ({"x", "y"} <= resolution.keys() or "value" in resolution):
+        raise ValueError(f"Collection {name} has no spatial_resolution with its unit: give the resolution in degrees.")
+
+    unit = str(resolution.get("unit", "")).lower()
+
+    if not unit.startswith("deg"):
+        raise ValueError(f"Can not snap the points to the grid of {name} in {unit or 'unknown unit'}: "
+                         "give the resolution in degrees.")
+
+    resolution = (float(resolution["x"]), float(resolution["y"])) if "x" in resolution else float(resolution["value"])
+
+    extent = collection["spatial_extent"]
+
+    return _pixel_grid(resolution, origin=(extent["xmin"], extent["ymax"]))
+
+
+class BaseWLTS:
+    """Base class for the WLTS clients.
+
+    It keeps the service address, the credentials and the options of the HTTP
+    client, and implements the parts of the protocol that do not depend on
+    how the requests are issued.
+    """
+
+    def __init__(self, url, lccs_url=None, access_token=None, timeout=30.0,
+                 max_connections=100, max_keepalive_connections=20,
+                 keepalive_expiry=5.0, http2=False, cache_ttl=300.0,
+                 cache_maxsize=128, trajectory_cache=None, retries=3,
+                 backoff_factor=0.5, rate_limit=None, hooks=None, compression=True, **client_options):
+        """Initialize the state shared by the WLTS clients.
+
+        See :class:`wlts.WLTS` for the description of the arguments.
+        """
+        #: str: URL for the WLTS server.
+        self._url = url if url[-1] != "/" else url[0:-1]
+
+        #: str: Authentication token to be used with the WLTS server.
+        self._access_token: str = access_token or ""
+        self._headers: Dict[str, str] = (
+            {"x-api-key": self._access_token} if self._access_token else {}
+        )
+
+        # httpx asks for every coding it can decode by default.
+        if not compression:
+            self._headers["Accept-Encoding"] = "identity"
+
+        #: str: URL for the LCCS server.
+        self._lccs_url = (
+            lccs_url if lccs_url else "https://brazildatacube.dpi.inpe.br/lccs/"
+        )
+
+        #: dict: Options used to build the underlying HTTP client.
+        self._client_options: Dict[str, Any] = dict(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+            **client_options,
+        )
+
+        #: dict: Options of the transport that retries the failed requests.
+        self._retry_options: Dict[str, Any] = dict(
+            retries=retries,
+            backoff_factor=backoff_factor,
+            rate_limiter=RateLimiter(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit,
+            on_retry=self._on_retry,
+        )
+
+        #: list: The event hooks, called as ``hook(event, data)`` (see :mod:`wlts.metrics`).
+        self._hooks = [hooks] if callable(hooks) else list(hooks or [])
+
+        #: TTLCache: Cache of the service metadata (collections, descriptions, languages).
+        self._cache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+
+        #: TrajectoryCache: Persistent cache of the trajectory documents.
+        self._trajectory_cache = (
+            TrajectoryCache(trajectory_cache) if isinstance(trajectory_cache, str) else trajectory_cache
+        )
+
+        #: The HTTP client, created on first use.
+        self._client = None
+
+        #: lccs.LCCS: The LCCS client, created on first use.
+        self._lccs = None
+
+        #: bool: Whether the server accepts batch trajectory requests, unknown until the first one.
+        self._batch_supported = None
+
+    @property
+    def url(self):
+        """Return the WLTS server instance URL."""
+        return self._url
+
+    def clear_cache(self, collection_id=None):
+        """Discard the cached service metadata.
+
+        Args:
+            collection_id (str, optional): Discard only the description of this collection.
+            By default, all the cached metadata is discarded.
+        """
+        if collection_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(("describe_collection", collection_id))
+
+    def add_hook(self, hook):
+        """Register an event hook, called as ``hook(event, data)`` (see :mod:`wlts.metrics`)."""
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        """Unregister an event hook."""
+        self._hooks.remove(hook)
+
+    def _emit(self, event, **data):
+        """Report an event to the hooks."""
+        for hook in self._hooks:
+            hook(event, data)
+
+    def _operation(self, url):
+        """Return the WLTS operation of a request URL."""
+        path = httpx.URL(str(url)).path.rstrip("/")
+        base = httpx.URL(self._url).path.rstrip("/")
+
+        return path[len(base):].lstrip("/") if path.startswith(base) else path
+
+    def _on_retry(self, request, attempt, delay, cause):
+        """Report a retry of the transport to the hooks."""
+        if not self._hooks:
+            return
+
+        status, error = (cause.status_code, None) if isinstance(cause, httpx.Response) else (None, cause)
+
+        self._emit("retry", op=self._operation(request.url), method=request.method, url=str(request.url),
+                   attempt=attempt, delay=delay, status=status, error=error)
+
+    @contextmanager
+    def _observe(self, op, method, url):
+        """Report the start and the end of a request to the hooks.
+
+        The caller stores the response in the yielded dictionary, under ``response``.
+        """
+        call = dict()
+
+        if not self._hooks:
+            yield call
+            return
+
+        self._emit("request_start", op=op, method=method, url=url)
+        start = time.perf_counter()
+
+        try:
+            yield call
+        except Exception as error:
+            self._emit("request_end", op=op, method=method, url=url, status=None,
+                       elapsed=time.perf_counter() - start, bytes=0, error=error)
+            raise
+
+        response = call["response"]
+
+        self._emit("request_end", op=op, method=method, url=url, status=response.status_code,
+                   elapsed=time.perf_counter() - start, bytes=len(response.content),
+                   wire_bytes=response.num_bytes_downloaded, encoding=response.headers.get("content-encoding"),
+                   error=None)
+
+    def _cache_get(self, key):
+        """Look up the metadata cache, reporting the hit or miss to the hooks."""
+        value = self._cache.get(key)
+
+        if self._hooks:
+            self._emit("cache", cache="metadata", op=key[0], hit=value is not None)
+
+        return value
+
+    def _http_client_options(self, retry_transport, default_transport):
+        """Return the options of the HTTP client, with a transport that retries the failed requests.
+
+        Args:
+            retry_transport: The retrying transport class (sync or async).
+            default_transport: The transport class used when the options do not include one.
+        """
+        options = dict(self._client_options)
+
+        if not self._retry_options["retries"] and self._retry_options["rate_limiter"] is None:
+            return options
+
+        transport = options.pop("transport", None)
+
+        if transport is None:
+            transport = default_transport(
+                limits=options["limits"],
+                http2=options["http2"],
+                **{k: options.pop(k) for k in _TRANSPORT_OPTIONS if k in options},
+            )
+
+        options["transport"] = retry_transport(transport, **self._retry_options)
+
+        return options
+
+    @property
+    def _lccs_service(self):
+        """Return the client of the LCCS service used to harmonize the trajectories."""
+        if self._lccs is None:
+            import lccs
+
+            self._lccs = lccs.LCCS(url=self._lccs_url, access_token=self._access_token)
+
+        return self._lccs
+
+    def _cached_trajectory(self, params):
+        """Look up a trajectory query in the persistent cache.
+
+        Returns:
+            tuple: The cache key and the cached document, or ``(None, None)`` without a cache.
+
+        Raises:
+            KeyError: If the cache is offline and the trajectory is not cached.
+        """
+        if self._trajectory_cache is None:
+            return None, None
+
+        key = TrajectoryCache.key(self._url, params)
+        data = self._trajectory_cache.get(key)
+
+        if self._hooks:
+            self._emit("cache", cache="trajectory", op="trajectory", hit=data is not None)
+
+        if data is None and self._trajectory_cache.offline:
+            raise KeyError(f"Trajectory not found in the offline cache: {key}")
+
+        return key, data
+
+    @staticmethod
+    def _query_options(options):
+        """Return the trajectory options sent to the server.
+
+        The harmonization is done by the client, the server is not aware of it.
+        """
+        return {k: v for k, v in options.items() if k != "target_system"}
+
+    @staticmethod
+    def _batch_body(points, params):
+        """Return the body of a batch trajectory request.
+
+        The batch request is a ``POST`` to the trajectory operation with a JSON
+        document holding the query options and the list of points::
+
+            {"collections": "...", "points": [{"latitude": -12.0, "longitude": -54.0}, ...]}
+
+        The server answers with ``{"trajectories": [...]}``, a trajectory
+        document for each point, in the same order.
+        """
+        return dict(params, points=[{"latitude": lat, "longitude": long} for lat, long in points])
+
+    @staticmethod
+    def _batch_documents(result, size):
+        """Return the trajectory documents of a batch trajectory response.
+
+        :raises ValueError: If the response does not contain a document for each point.
+        """
+        documents = result.get("trajectories") if isinstance(result, dict) else None
+
+        if not isinstance(documents, list) or len(documents) != size:
+            raise ValueError(f"Invalid batch trajectory response: expected {size} trajectories.")
+
+        return documents
+
+    @contextmanager
+    def _open_checkpoint(self, checkpoint, options):
+        """Open a checkpoint given by its path for the duration of a run.
+
+        The checkpoint must have been written by the same query: the server URL
+        and the query options, normalized as the trajectory cache keys.
+
+        Raises:
+            ValueError: If the checkpoint was written by a query with other options.
+        """
+        if checkpoint is None:
+            yield None
+            return
+
+        query = TrajectoryCache.key(self._url, self._query_options(options))
+
+        if not isinstance(checkpoint, str):
+            checkpoint.match(query)
+            yield checkpoint
+            return
+
+        with Checkpoint(checkpoint, query) as cp:
+            yield cp
+
+    @staticmethod
+    def _error_collector(errors):
+        """Return the list of failed points and the callback that fills it, according to the ``errors`` policy.
+
+        Raises:
+            ValueError: If the policy is not ``raise`` or ``collect``.
+        """
+        if errors not in ("raise", "collect"):
+            raise ValueError("errors must be 'raise' or 'collect'!")
+
+        failures = []
+
+        def on_error(point_id, point, error):
+            failures.append(dict(point_id=point_id, latitude=point[0], longitude=point[1], error=str(error)))
+
+        return failures, (on_error if errors == "collect" else None)
+
+    @staticmethod
+    def _identified(points, validate=True):
+        """Give an identifier to each point of an iterable, yielding ``(point_id, (latitude, longitude))`` items.
+
+        Args:
+            points (iterable): ``(latitude, longitude)`` pairs, numbered from 1, or
+                ``(latitude, longitude, point_id)`` triples carrying their own identifier.
+            validate (bool): Check the coordinates of each point. Disable it for points already checked.
+        """
+        for index, point in enumerate(points, start=1):
+            lat, long, *point_id = point
+
+            if validate:
+                _validate_lat_long(lat, long)
+
+            yield (point_id[0] if point_id else index), (lat, long)
+
+    @staticmethod
+    def _numbered(items, positions):
+        """Record the position of each ``(point_id, (latitude, longitude))`` item, indexed by its identifier, as it is consumed.
+
+        Args:
+            items (iterable): The identified points, as yielded by ``_identified``.
+            positions (dict): Filled with the position of each point identifier.
+        """
+        for position, item in enumerate(items):
+            positions.setdefault(item[0], position)
+            yield item
+
+    @staticmethod
+    def _grid(snap):
+        """Return the pixel grid given by a collection metadata or by a resolution in degrees."""
+        if snap is None:
+            return None
+
+        if isinstance(snap, dict):
+            return _collection_grid(snap)
+
+        return _pixel_grid(snap)
+
+    @staticmethod
+    def _distinct_points(points, grid=None):
+        """Return the distinct locations of a list of points.
+
+        Args:
+            points (list): The ``(latitude, longitude)`` pairs.
+            grid (callable, optional): Snap each point to its pixel before comparing them.
+
+        Returns:
+            tuple: The list of distinct locations, and for each point the index of its location in that list.
+        """
+        index, distinct, owners = dict(), [], []
+
+        for point in points:
+            key = grid(*point) if grid is not None else tuple(point)
+
+            if key not in index:
+                index[key] = len(distinct)
+                distinct.append(key)
+
+            owners.append(index[key])
+
+        return distinct, owners
+
+    @staticmethod
+    def _fan_out(points, owners, trajectories, failures):
+        """Give back to each original point the trajectory, or the failure, of its distinct location.
+
+        Args:
+            points (list): The original ``(latitude, longitude)`` pairs.
+            owners (list): For each original point, the index of its distinct location.
+            trajectories (list): The trajectories retrieved for the distinct locations, in order.
+            failures (list): The failures of the distinct locations, whose ``point_id`` is the location index plus one.
+
+        Returns:
+            tuple: The trajectories and the failures of the original points.
+        """
+        failed = {failure["point_id"] - 1: failure for failure in failures}
+        succeeded = [i for i in range(len(trajectories) + len(failed)) if i not in failed]
+        by_location = dict(zip(succeeded, trajectories))
+
+        result, errors = [], []
+
+        for point_id, ((lat, long), owner) in enumerate(zip(points, owners), start=1):
+            if owner in failed:
+                errors.append(dict(failed[owner], point_id=point_id, latitude=lat, longitude=long))
+                continue
+
+            tj = by_location[owner]
+            records = [dict(record, point_id=point_id) for record in tj.trajectory]
+            result.append(Trajectory(dict(tj, result=dict(tj["result"], trajectory=records))))
+
+        return result, errors
+
+    @staticmethod
+    def _restore(checkpoint, chunk):
+        """Split the items of a chunk into the trajectories restored from a checkpoint and the points to retrieve.
+
+        The items are ``(position, (point_id, (latitude, longitude)))``, keyed by their position in the
+        run, since the identifiers given by the caller may repeat.
+
+        Returns:
+            tuple: The restored trajectories indexed by position, and the list of missing items.
+        """
+        if checkpoint is None:
+            return dict(), list(chunk)
+
+        restored, missing = dict(), []
+
+        for position, (point_id, (lat, long)) in chunk:
+            data = checkpoint.get(position, lat, long)
+
+            if data is None:
+                missing.append((position, (point_id, (lat, long))))
+            else:
+                restored[position] = Trajectory(data)
+
+        return restored, missing
+
+    @staticmethod
+    def _record(checkpoint, missing, fetched, result):
+        """Record the retrieved trajectories in the checkpoint and add them to the result, indexed by position."""
+        for (position, (_, (lat, long))), tj in zip(missing, fetched):
+            if checkpoint is not None:
+                checkpoint.add(position, lat, long, tj)
+
+            result[position] = tj
+
+        return result
+
+    @staticmethod
+    def _check_options(options):
+        """Check the keyword arguments given to a trajectory query."""
+        invalid_parameters = set(options) - {
+            "start_date",
+            "end_date",
+            "collections",
+            "geometry",
+            "target_system",
+            "language",
+        }
+
+        if invalid_parameters:
+            raise AttributeError("invalid parameter(s): {}".format(invalid_parameters))
+
+    @staticmethod
+    def _check_language(language, supported):
+        """Check if the language is one of the languages supported by the service."""
+        if language not in [e.value for e in supported]:
+            s = ", ".join([e.value for e in supported])
+            raise KeyError(f"Language not supported! Use: {s}")
+
+    @staticmethod
+    def _language_enum(data):
+        """Build the enumeration of supported languages from the service root document."""
+        import enum
+
+        return enum.Enum(
+            "Language",
+            {i["language"]: i["language"] for i in data["supported_language"]},
+            type=str,
+        )
+
+    @staticmethod
+    def _stamp(data, point_id):
+        """Tag the records of a trajectory document with the point identifier."""
+        for trj in data["result"]["trajectory"]:
+            trj["point_id"] = point_id
+
+        return data
+
+    @staticmethod
+    def _class_pairs(mapping_group):
+        """Resolve the source and target class titles of a group of LCCS mappings.
+
+        Each access to ``mappings`` of an LCCS group builds new mappings, which
+        retrieve their classes from the service, so they are resolved only once.
+
+        Returns:
+            list: The ``(source class title, target class title)`` pairs.
+        """
+        return [(map.source_class.title, map.target_class.title) for map in mapping_group.mappings]
+
+    @staticmethod
+    def _mapping_lookup(mappings):
+        """Build the table that translates the classes of each collection.
+
+        Args:
+            mappings (dict): The class pairs built by ``_class_pairs``, indexed by the collection name.
+
+        Returns:
+            dict: The target class title, indexed by ``(collection, source class title)``.
+        """
+        lookup = dict()
+
+        for collection, pairs in mappings.items():
+            for source, target in pairs:
+                lookup.setdefault((collection, source), target)
+
+        return lookup
+
+    @staticmethod
+    def _apply_mappings(data, lookup):
+        """Translate the classes of the trajectory records in a single pass.
+
+        Args:
+            data (list): The trajectory records.
+            lookup (dict): The table built by ``_mapping_lookup``.
+
+        Returns:
+            list: New records, with the classes without a mapping unchanged.
+        """
+        result = []
+
+        for record in data:
+            record = dict(record)
+            record["class"] = lookup.get((record["collection"], record["class"]), record["class"])
+            result.append(record)
+
+        return result
+
+    @classmethod
+    def _harmonized(cls, trajectories, lookup):
+        """Return a copy of a Trajectory or of Trajectories with the classes translated by the lookup table."""
+        def harmonized(tj):
+            records = cls._apply_mappings(tj.trajectory, lookup)
+
+            return Trajectory(dict(tj, result=dict(tj["result"], trajectory=records)))
+
+        if isinstance(trajectories, Trajectories):
+            return Trajectories(
+                dict(trajectories, trajectories=[harmonized(tj) for tj in trajectories["trajectories"]])
+            )
+
+        return harmonized(trajectories)
+
+    def _request(self, op, params):
+        """Return the URL and the query string parameters of a WLTS operation."""
+        url = f"{self._url}/{op}"
+        params.setdefault("access_token", self._access_token)
+
+        return url, params
+
+    def _parse(self, response, op=None):
+        """Decode the JSON document of a WLTS response, reporting the time spent to the hooks.
+
+        The document is decoded with orjson or msgspec when one of them is installed.
+
+        :raises ValueError: If the response body does not contain a valid json.
+        """
+        response.raise_for_status()
+
+        content_type = response.headers.get("content-type", "")
+        if "application/json" not in content_type:
+            raise ValueError(f"HTTP Response is not JSON: Content-Type: {content_type}")
+
+        if not self._hooks:
+            return json_loads(response.content)
+
+        start = time.perf_counter()
+        data = json_loads(response.content)
+        self._emit("parse", op=op, elapsed=time.perf_counter() - start)
+
+        return data
+
+    @classmethod
+    def plot(cls, dataframe, **parameters):
+        """Plot the trajectory on a scatter or bar plot.
+
+        Args:
+            dataframe (pandas.DataFrame): The trajectory as dataframe representation.
+
+        Keyword Args:
+            marker_size (int): The marker size .
+            title (str): The title. Ex: Land Use and Cover Trajectory.
+            title_y (str): The title in the y-axis. Ex: Number of Points.
+            date (str): Title of date. Ex: Year.
+            value (str): The label of value. Ex: Collection.
+            width (int): The width size.
+            height (int): The height size.
+            font_size (int): The font size.
+            type (str): The graphic type: scatter or bar.
+            textfont_size (int): The text font size.
+            textangle (int): The text angle. Ex: 0.
+            textposition (str): Specifies the location of the text. Like “inside
+            cliponaxis (bool): Determines whether the text nodes are clipped abo
+            text_auto (bool): Determines  the display of text.
+            textposition (str): Specifies the location of the text.
+            opacity (float): The text opacity.
+            marker_line_width (float): The marker line width.
+            bar_title (bool): Update the title with spaces and letter uppercase.
+
+        Raises:
+            ImportError: If plotly could not be imported.
+
+        """
+        try:
+            import plotly.express as px
+        except ImportError:
+            raise ImportError("You should install Plotly!")
+
+        parameters.setdefault("marker_size", 10)
+        parameters.setdefault("title", "Land Use and Cover Trajectory")
+        parameters.setdefault("title_y", "Number of Points")
+        parameters.setdefault("legend_title_text", "Class")
+        parameters.setdefault("date", "Year")
+        parameters.setdefault("value", "Collection")
+        parameters.setdefault("width", 950)
+        parameters.setdefault("height", 320)
+        parameters.setdefault("font_size", 12)
+        parameters.setdefault("type", "scatter")
+
+        # Parameters to update traces
+        parameters.setdefault("textfont_size", 12)
+        parameters.setdefault("textangle", 0)
+        parameters.setdefault("textposition", "auto")
+        parameters.setdefault("cliponaxis", False)
+
+        # Parameters to update layout
+        parameters.setdefault("text_auto", True)
+        parameters.setdefault("textposition", "auto")
+        parameters.setdefault("opacity", 0.8)
+        parameters.setdefault("marker_line_width", 1.5)
+
+        # Update column title bar plot
+        parameters.setdefault("bar_title", False)
+
+        df = dataframe.copy()
+        df["class"] = df["class"].astype("category")
+        df["date"] = df["date"].astype("category")
+        df["collection"] = df["collection"].astype("category")
+
+        def update_column_title(title):
+            """Update the collection name with spaces and capitalize."""
+            new_title = (title.text.split("=")[-1]).capitalize()
+
+            if len(new_title.split("_")) > 1:
+                return (
+                    new_title.split("_")[0]
+                    + " "
+                    + new_title.split("_")[-1].capitalize()
+                )
+
+            return new_title.split("_")[0]
+
+        if parameters["type"] == "scatter":
+            # Validates the data for this plot type
+            if len(dataframe.point_id.unique()) == 1:
+                fig = px.scatter(
+                    df,
+                    y=["class", "collection"],
+                    x="date",
+                    color="class",
+                    symbol="class",
+                    labels={
+                        "date": parameters["date"],
+                        "value": parameters["value"],
+                    },
+                    title=parameters["title"],
+                    width=parameters["width"],
+                    height=parameters["height"],
+                )
+                fig.update_traces(marker_size=parameters["marker_size"])
+                fig.update_layout(
+                    legend_title_text=parameters["legend_title_text"],
+                    font=dict(
+                        size=parameters["font_size"],
+                    ),
+                )
+
+                return fig
+            else:
+                raise ValueError(
+                    "The scatter plot is for one point only! Please try another type: bar plot."
+                )
+
+        if parameters["type"] == "bar":
+            # Validates the data for this plot type - Unique collection or multiples collections
+            if (
+                len(dataframe.collection.unique()) == 1
+                and len(dataframe.point_id.unique()) >= 1
+            ):
+                df_group = (
+                    dataframe.groupby(["date", "class"]).count()["point_id"].unstack()
+                )
+                fig = px.bar(
+                    df_group,
+                    title=parameters["title"],
+                    width=parameters["width"],
+                    height=parameters["height"],
+                    labels={"date": parameters["date"], "value": parameters["value"]},
+                    text_auto=parameters["text_auto"],
+                )
+                fig.update_layout(
+                    legend_title_text=parameters["legend_title_text"],
+                    font=dict(size=parameters["font_size"]),
+                )
+                fig.update_traces(
+                    textfont_size=parameters["textfont_size"],
+                    textangle=parameters["textangle"],
+                    textposition=parameters["textposition"],
+                    cliponaxis=parameters["cliponaxis"],
+                    opacity=parameters["opacity"],
+                    marker_line_width=parameters["marker_line_width"],
+                )
+
+                return fig
+
+            elif (
+                len(dataframe.collection.unique()) >= 1
+                and len(dataframe.point_id.unique()) >= 1
+            ):
+                mydf = (
+                    dataframe.groupby(["date", "collection"])
+                    .apply(lambda x: x.groupby("class").count())
+                    .rename(columns={"collection": "size", "date": "date_old"})
+                    .reset_index()
+                )
+
+                fig = px.bar(
+                    mydf,
+                    x="date",
+                    y="size",
+                    facet_col="collection",
+                    color="class",
+                    text="size",
+                    barmode="overlay",
+                    width=parameters["width"],
+                    height=parameters["height"],
+                    labels={
+                        "size": parameters["title_y"],
+                        "date": parameters["date"],
+                        "collection": "Collection",
+                    },
+                )
+
+                fig.update_traces(
+                    textfont_size=parameters["textfont_size"],
+                    textangle=parameters["textangle"],
+                    textposition=parameters["textposition"],
+                    cliponaxis=parameters["cliponaxis"],
+                    opacity=parameters["opacity"],
+                    marker_line_width=parameters["marker_line_width"],
+                )
+                fig.update_layout(
+                    legend_title_text="Class",
+                    font=dict(
+                        size=12,
+                    ),
+                    title_text=parameters["title"],
+                )
+
+                if parameters["bar_title"]:
+                    fig.for_each_annotation(
+                        lambda a: a.update(text=update_column_title(a))
+                    )
+
+                return fig
+        else:
+            raise RuntimeError("No plot support for this trajectory!")
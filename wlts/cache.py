@@ -0,0 +1,301 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Caches used by the WLTS clients."""
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from .utils import json_loads
+
+#: Number of buffered access times of cache hits that triggers a write to the database.
+_ACCESS_BATCH_SIZE = 1000
+
+
+class TTLCache:
+    """A thread-safe in-memory cache with time-to-live and least-recently-used eviction.
+
+    Entries expire ``ttl`` seconds after being stored. When the cache holds
+    ``maxsize`` entries, storing a new one evicts the least recently used entry.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = 300.0,
+                 timer: Callable[[], float] = time.monotonic) -> None:
+        """Create a cache.
+
+        Args:
+            maxsize (int): The maximum number of entries. Use ``0`` to disable the cache.
+            ttl (float, optional): The lifetime of the entries, in seconds. Use ``None`` for entries that never expire.
+            timer (callable): The clock used to expire the entries.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value stored for ``key`` or ``default`` if it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                return default
+
+            expires, value = entry
+
+            if expires is not None and expires <= self._timer():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` for ``key``, evicting the expired and the least recently used entries if needed."""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            now = self._timer()
+            expires = now + self.ttl if self.ttl is not None else None
+
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+
+            if len(self._data) > self.maxsize:
+                for k in [k for k, (e, _) in self._data.items() if e is not None and e <= now]:
+                    del self._data[k]
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove the entry stored for ``key``, if any."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Check if there is a valid entry for ``key``."""
+        sentinel = object()
+
+        return self.get(key, sentinel) is not sentinel
+
+    def __len__(self) -> int:
+        """Return the number of stored entries, including the expired ones not evicted yet."""
+        return len(self._data)
+
+
+class TrajectoryCache:
+    """A persistent cache of trajectory documents stored in a SQLite database.
+
+    The documents are indexed by the normalized query parameters, so the same
+    location, collections, dates, geometry and language always reuse the same
+    entry. When the cache grows beyond ``max_entries`` or ``max_bytes``, the
+    least recently used entries are evicted.
+
+    Example:
+        Reuse the trajectories retrieved in previous runs:
+
+        .. doctest::
+            :skipif: WLTS_EXAMPLE_URL is None
+
+            >>> from wlts import *
+            >>> from wlts.cache import TrajectoryCache
+            >>> service = WLTS(WLTS_EXAMPLE_URL, trajectory_cache=TrajectoryCache('trajectories.db'))
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 read_only: bool = False, offline: bool = False) -> None:
+        """Open or create a trajectory cache.
+
+        Args:
+            path (str): The path of the SQLite database file.
+            max_entries (int, optional): The maximum number of cached trajectories.
+            max_bytes (int, optional): The maximum size, in bytes, of the cached (compressed) documents.
+            read_only (bool): Never write to the cache. The database must already exist.
+            offline (bool): Never query the server: a trajectory missing in the cache raises ``KeyError``.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self.offline = offline
+        self._lock = threading.Lock()
+
+        #: dict: The access times of the cache hits not written to the database yet.
+        self._accessed: Dict[str, float] = dict()
+
+        if read_only:
+            self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            with self._db:
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS trajectory "
+                    "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+                )
+                self._db.execute("CREATE INDEX IF NOT EXISTS trajectory_accessed ON trajectory (accessed)")
+
+        # Running totals of the entries and of their sizes, checked against the limits on each write.
+        self._entries, self._bytes = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM trajectory"
+        ).fetchone()
+
+    @staticmethod
+    def key(url: str, params: Dict[str, Any]) -> str:
+        """Return the cache key of a trajectory query.
+
+        Args:
+            url (str): The WLTS server URL.
+            params (dict): The query parameters of the trajectory operation.
+        """
+        query = {k: v for k, v in params.items() if k != "access_token" and v is not None}
+
+        collections = query.get("collections")
+        if collections is not None:
+            if isinstance(collections, str):
+                collections = collections.split(",")
+            query["collections"] = ",".join(c.strip() for c in collections if c.strip())
+
+        for name in ("latitude", "longitude"):
+            if name in query:
+                query[name] = float(query[name])
+
+        if "geometry" in query:
+            query["geometry"] = str(query["geometry"]).lower()
+
+        return json.dumps([url, query], sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the trajectory document stored for ``key`` or ``None`` if it is not cached.
+
+        The access time of a hit is kept in memory and written in batches, on
+        the next write or eviction, or when the cache is closed.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT value FROM trajectory WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+                return None
+
+            if not self.read_only:
+                self._accessed[key] = time.time()
+
+                if len(self._accessed) >= _ACCESS_BATCH_SIZE:
+                    with self._db:
+                        self._flush()
+
+        return json_loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a trajectory document, evicting the least recently used entries if needed."""
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        """Store many trajectory documents in a single transaction, evicting the least recently used entries if needed.
+
+        Args:
+            items (iterable): The ``(key, document)`` pairs.
+        """
+        if self.read_only:
+            return
+
+        blobs = [(key, zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))) for key, value in items]
+
+        with self._lock, self._db:
+            self._flush()
+
+            for key, blob in blobs:
+                row = self._db.execute("SELECT size FROM trajectory WHERE key = ?", (key,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO trajectory (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, blob, len(blob), time.time()),
+                )
+
+                if row is None:
+                    self._entries += 1
+                else:
+                    self._bytes -= row[0]
+
+                self._bytes += len(blob)
+
+            self._evict()
+
+    def _flush(self) -> None:
+        """Write the buffered access times to the database."""
+        if self._accessed:
+            self._db.executemany("UPDATE trajectory SET accessed = ? WHERE key = ?",
+                                 [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _over_limits(self, entries: int, total: int) -> bool:
+        """Check if the given number of entries and total size exceed the cache limits."""
+        return (self.max_entries is not None and entries > self.max_entries) or \
+            (self.max_bytes is not None and total > self.max_bytes)
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries beyond the cache limits."""
+        if not self._over_limits(self._entries, self._bytes):
+            return
+
+        count, freed = 0, 0
+
+        # Walk the index from the least recently used entry, only as far as needed.
+        for (size,) in self._db.execute("SELECT size FROM trajectory ORDER BY accessed"):
+            if not self._over_limits(self._entries - count, self._bytes - freed):
+                break
+
+            count += 1
+            freed += size
+
+        self._db.execute(
+            "DELETE FROM trajectory WHERE key IN (SELECT key FROM trajectory ORDER BY accessed LIMIT ?)", (count,)
+        )
+        self._entries -= count
+        self._bytes -= freed
+
+    def clear(self) -> None:
+        """Remove all the cached trajectories."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM trajectory")
+            self._accessed.clear()
+            self._entries, self._bytes = 0, 0
+
+    def close(self) -> None:
+        """Write the buffered access times and close the database."""
+        with self._lock:
+            if not self.read_only:
+                with self._db:
+                    self._flush()
+
+            self._db.close()
+
+    def __len__(self) -> int:
+        """Return the number of cached trajectories."""
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM trajectory").fetchone()[0]
@@ -0,0 +1,143 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Checkpoints of batch trajectory retrievals."""
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+
+def _plain(value: Any) -> Any:
+    """Convert a NumPy scalar, such as a point identifier read from a dataframe column, into a Python value."""
+    if hasattr(value, "item"):
+        return value.item()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class Checkpoint:
+    """A JSON Lines file recording the trajectories already retrieved in a batch run.
+
+    Each retrieved trajectory is appended to the file as soon as it arrives.
+    When a run is restarted with the same checkpoint and the same points,
+    the points found in the file are restored instead of being queried again.
+    The first line of the file records the query, so a checkpoint is never
+    restored by a run with other options.
+    """
+
+    def __init__(self, path: str, query: Optional[str] = None) -> None:
+        """Open a checkpoint file, loading the trajectories recorded by previous runs.
+
+        Args:
+            path (str): The path of the checkpoint file. It is created if it does not exist.
+            query (str, optional): The normalized query of the run (see :meth:`match`).
+
+        Raises:
+            ValueError: If the checkpoint was written by another query.
+        """
+        self.path = path
+        self.query: Optional[str] = None
+        self._done: Dict[int, Tuple[float, float, Dict[str, Any]]] = dict()
+        self._lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    # A line cut short by an interrupted run is discarded.
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    if 'query' in entry:
+                        self.query = entry['query']
+                        continue
+
+                    self._done[entry['position']] = (entry['latitude'], entry['longitude'], entry['trajectory'])
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+        if query is not None:
+            try:
+                self.match(query)
+            except ValueError:
+                self._file.close()
+                raise
+
+    def match(self, query: str) -> None:
+        """Check that the checkpoint was written by a query, recording the query in a new checkpoint.
+
+        Args:
+            query (str): The normalized query, as the keys of :class:`wlts.cache.TrajectoryCache`,
+                without the coordinates of the points.
+
+        Raises:
+            ValueError: If the checkpoint was written by another query.
+        """
+        with self._lock:
+            if self.query is None and not self._done:
+                self.query = query
+                self._write(json.dumps(dict(query=query), ensure_ascii=False))
+            elif self.query != query:
+                raise ValueError(f"Checkpoint {self.path} does not match the query: it was written with other options.")
+
+    def get(self, position: int, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """Return the trajectory document recorded for the point at a position of the run, or ``None``.
+
+        The document is released once returned, as each point is restored only once.
+
+        Raises:
+            ValueError: If the checkpoint recorded another location for the point.
+        """
+        with self._lock:
+            entry = self._done.pop(position, None)
+
+        if entry is None:
+            return None
+
+        if (entry[0], entry[1]) != (latitude, longitude):
+            raise ValueError(f"Checkpoint {self.path} does not match the points: point {position + 1} differs.")
+
+        return entry[2]
+
+    def add(self, position: int, latitude: float, longitude: float, trajectory: Dict[str, Any]) -> None:
+        """Record the trajectory document of the point at a position of the run."""
+        line = json.dumps(
+            dict(position=position, latitude=latitude, longitude=longitude, trajectory=trajectory),
+            ensure_ascii=False, default=_plain,
+        )
+
+        with self._lock:
+            self._write(line)
+
+    def _write(self, line: str) -> None:
+        """Append a line to the checkpoint file."""
+        self._file.write(line + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the checkpoint file."""
+        self._file.close()
+
+    def __enter__(self) -> "Checkpoint":
+        """Enter the runtime context of the checkpoint."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Close the checkpoint when leaving the runtime context."""
+        self.close()
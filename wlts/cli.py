@@ -17,6 +17,9 @@
 #
 
 """Command line interface for the WLTS client."""
+import io
+import os
+import sys
 from time import time
 
 import click
@@ -28,7 +31,9 @@ from rich.panel import Panel
 from rich.tree import Tree
 
 
+from .metrics import MetricsCollector
 from .wlts import WLTS
+from .writer import FORMATS, RecordWriter, TrajectoryWriter
 
 
 class Config:
@@ -87,8 +92,9 @@ def list_collections(config: Config, verbose):
         table.add_column("Collection Name", style="green", no_wrap=True)
         table.add_column("Collection Title", style="green", no_wrap=True)
 
-        for collection in config.service.collections:
-            describe_collection = config.service[collection]
+        names = config.service.collections
+
+        for collection, describe_collection in zip(names, config.service.describe_many(names)):
             table.add_row(collection, describe_collection["title"])
 
         console.print(table)
@@ -192,29 +198,35 @@ def trajectory(
     if language:
         args["language"] = language
 
-    # Progress bar to indicate processing time
+    metrics = MetricsCollector()
+    description = "[cyan]Processing trajectory request..."
+
+    # The bar pulses while the requests are in flight and is completed by their end.
     with Progress(
         TextColumn("[progress.description]{task.description}"),
         BarColumn(),
         TimeElapsedColumn(),
     ) as progress:
-        task = progress.add_task("[cyan]Processing trajectory request...", total=100)
+        task = progress.add_task(description, total=None)
 
-        # Measure start time
-        start_time = time()
+        def on_event(event, data):
+            metrics(event, data)
 
-        # Simulate progress
-        for _ in range(5):
-            progress.update(task, advance=20)
+            if event == "retry":
+                progress.update(task, description=f"{description} [yellow](retry {data['attempt']})")
 
-        # Retrieve trajectory data
-        retval = config.service.tj(latitude=latitude, longitude=longitude, **args)
+        config.service.add_hook(on_event)
 
-        # Measure end time
-        end_time = time()
+        start_time = time()
 
-        # Calculate total time
-        total_time = end_time - start_time
+        try:
+            retval = config.service.tj(latitude=latitude, longitude=longitude, **args)
+        finally:
+            config.service.remove_hook(on_event)
+
+        total_time = time() - start_time
+
+        progress.update(task, description=description, total=1, completed=1)
 
     # Display the trajectory data in a table format
     table = Table(title=f"Trajectory Results (Time: {total_time:.2f} seconds)")
@@ -235,4 +247,171 @@ def trajectory(
     console.print(table)
 
     if verbose:
+        for op, stats in metrics.to_dict()["requests"].items():
+            console.print(
+                f"[black]\t{op}: {stats['latency']['count']} request(s), {stats['latency']['sum']:.2f} seconds, "
+                f"{stats['bytes']} bytes ({stats['wire_bytes']} received), {stats['retries']} retries[/black]"
+            )
         console.print(f"[black]\tFinished in {total_time:.2f} seconds![/black]")
+
+
+#: The output formats given by the extension of the output file.
+_OUTPUT_FORMATS = dict(FORMATS, **{".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"})
+
+
+@cli.command("batch-trajectory")
+@click.option(
+    "-i",
+    "--input",
+    "source",
+    default="-",
+    show_default=True,
+    help="CSV, GeoJSON, GeoPackage, Shapefile or (Geo)Parquet file with the points, or - for the standard input.",
+)
+@click.option(
+    "--input-format",
+    type=click.Choice(["auto", "csv", "geojson"]),
+    default="auto",
+    show_default=True,
+    help="Format of the input. By default, given by the file extension, or CSV for the standard input.",
+)
+@click.option("--latitude-column", default="latitude", show_default=True, help="Column with the latitudes")
+@click.option("--longitude-column", default="longitude", show_default=True, help="Column with the longitudes")
+@click.option("--id-column", default=None, help="Column with the identifiers of the points, used as point_id")
+@click.option("-o", "--output", default="-", show_default=True, help="Output file, or - for the standard output.")
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(["csv", "ndjson", "parquet", "geoparquet", "arrow"]),
+    default=None,
+    help="Output format. By default, given by the output file extension, or CSV.",
+)
+@click.option(
+    "-a",
+    "--collections",
+    required=False,
+    type=str,
+    help="Collections list (items separated by comma)",
+)
+@click.option("--start-date", required=False, default=None, type=str, help="Start date")
+@click.option("--end-date", required=False, default=None, type=str, help="End date")
+@click.option("--language", required=False, default=None, type=str, help="Language")
+@click.option("--geometry", is_flag=True, default=False, help="Retrieve the geometry of the pixels")
+@click.option("--max-workers", default=8, show_default=True, type=int, help="Maximum number of concurrent requests")
+@click.option("--batch-size", default=None, type=int, help="Number of points packed in each request")
+@click.option(
+    "--errors",
+    type=click.Choice(["raise", "collect"]),
+    default="raise",
+    show_default=True,
+    help="Stop at the first point whose trajectory can not be retrieved, or collect its error and go on.",
+)
+@click.option("--checkpoint", default=None, type=str, help="File recording the trajectories already retrieved")
+@pass_config
+def batch_trajectory(
+    config: Config,
+    source,
+    input_format,
+    latitude_column,
+    longitude_column,
+    id_column,
+    output,
+    output_format,
+    collections,
+    start_date,
+    end_date,
+    language,
+    geometry,
+    max_workers,
+    batch_size,
+    errors,
+    checkpoint,
+):
+    """Retrieve the trajectories of the points of a file, writing the records as they arrive."""
+    from .points import read_points
+
+    if output_format is None:
+        extension = os.path.splitext(output)[1].lower() if output != "-" else ""
+        output_format = _OUTPUT_FORMATS.get(extension, "csv")
+
+    if output == "-" and output_format not in ("csv", "ndjson"):
+        raise click.UsageError(f"The {output_format} format must be written to a file, use --output.")
+
+    args = dict()
+    if collections:
+        args["collections"] = collections
+    if start_date:
+        args["start_date"] = start_date
+    if end_date:
+        args["end_date"] = end_date
+    if language:
+        args["language"] = language
+    if geometry or output_format == "geoparquet":
+        args["geometry"] = True
+
+    data, opened = source, None
+
+    if input_format == "geojson":
+        import geopandas as gpd
+
+        data = gpd.read_file(io.BytesIO(sys.stdin.buffer.read()) if source == "-" else source)
+    elif source == "-":
+        data = click.open_file("-")
+    elif input_format == "csv":
+        data = opened = open(source, newline="", encoding="utf-8")
+
+    points = read_points(data, latitude_column, longitude_column, id_column)
+
+    if output_format in ("csv", "ndjson"):
+        stream = click.open_file(output, "w", encoding="utf-8")
+        writer = RecordWriter(stream, output_format)
+    else:
+        stream, writer = None, TrajectoryWriter(output, output_format)
+
+    # The progress goes to the standard error, leaving the standard output to the records.
+    progress_console = Console(stderr=True)
+    failures = []
+    description = "[cyan]Processing trajectory requests..."
+
+    with Progress(
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        TextColumn("{task.completed} points"),
+        TimeElapsedColumn(),
+        console=progress_console,
+    ) as progress:
+        task = progress.add_task(description, total=None)
+
+        def on_error(point_id, point, error):
+            failures.append(point_id)
+            progress.console.print(f"[red]Point {point_id} {point}: {error}[/red]")
+            progress.update(task, description=f"{description} [red]({len(failures)} failed)")
+
+        start_time = time()
+
+        try:
+            with writer:
+                for trj in config.service.iter_trajectories(
+                    points,
+                    max_workers=max_workers,
+                    batch_size=batch_size,
+                    on_error=on_error if errors == "collect" else None,
+                    checkpoint=checkpoint,
+                    **args,
+                ):
+                    writer.write(trj)
+                    progress.advance(task)
+        finally:
+            if stream is not None:
+                stream.close()
+            if opened is not None:
+                opened.close()
+
+        completed = progress.tasks[0].completed
+        progress.update(task, total=completed or 1, completed=completed or 1)
+
+    progress_console.print(
+        f"[black]\t{completed} points, {writer.rows} records written in {time() - start_time:.2f} seconds"
+        f"{f', {len(failures)} failed' if failures else ''}.[/black]"
+    )
@@ -78,6 +78,11 @@ class Collections(dict):
         """Return the spatial extent of the collection."""
         return self['spatial_extent']
 
+    @property
+    def spatial_resolution(self) -> Union[float, Dict[str, Any], None]:
+        """Return the spatial resolution of the collection, if the service provides it."""
+        return self.get('spatial_resolution')
+
     @property
     def classification_system(self) -> Dict[str, Any]:
         """Return the classification system of the collection."""
@@ -0,0 +1,143 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""A compact representation of trajectories backed by NumPy arrays."""
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class CompactTrajectories:
+    """A memory efficient container for the records of many trajectories.
+
+    The ``class``, ``collection`` and ``date`` values are interned into
+    integer codes and, together with the ``point_id`` of each record, are
+    stored in NumPy arrays. Other record fields, such as ``geom``, are not kept.
+
+    Example:
+        Retrieve a large set of points without keeping the JSON documents in memory:
+
+        .. doctest::
+            :skipif: WLTS_EXAMPLE_URL is None
+
+            >>> from wlts import *
+            >>> from wlts.compact import CompactTrajectories
+            >>> service = WLTS(WLTS_EXAMPLE_URL)
+            >>> points = ((-12.0 - i * 0.01, -54.0) for i in range(1000))
+            >>> result = CompactTrajectories.from_trajectories(service.iter_trajectories(points, max_workers=8))
+            >>> df = result.df()
+    """
+
+    def __init__(self, classes: List[str], collections: List[str], dates: List[str],
+                 class_codes: np.ndarray, collection_codes: np.ndarray, date_codes: np.ndarray,
+                 point_ids: np.ndarray) -> None:
+        """Create a CompactTrajectories object.
+
+        Args:
+            classes (List[str]): The distinct class names.
+            collections (List[str]): The distinct collection names.
+            dates (List[str]): The distinct dates.
+            class_codes (numpy.ndarray): The index in ``classes`` of the class of each record.
+            collection_codes (numpy.ndarray): The index in ``collections`` of the collection of each record.
+            date_codes (numpy.ndarray): The index in ``dates`` of the date of each record.
+            point_ids (numpy.ndarray): The point identifier of each record.
+        """
+        self.classes = classes
+        self.collections = collections
+        self.dates = dates
+        self.class_codes = class_codes
+        self.collection_codes = collection_codes
+        self.date_codes = date_codes
+        self.point_ids = point_ids
+
+    @classmethod
+    def from_trajectories(cls, trajectories: Iterable[Any]) -> "CompactTrajectories":
+        """Build the compact representation from an iterable of trajectories.
+
+        The trajectories are consumed one at a time, so a stream such as
+        :meth:`wlts.WLTS.iter_trajectories` never needs to be held in memory.
+
+        Args:
+            trajectories: An iterable of :class:`wlts.trajectory.Trajectory`.
+        """
+        classes: Dict[str, int] = dict()
+        collections: Dict[str, int] = dict()
+        dates: Dict[str, int] = dict()
+
+        class_codes, collection_codes, date_codes = array('i'), array('i'), array('i')
+        point_ids = array('q')
+
+        for trj in trajectories:
+            for record in trj.trajectory:
+                class_codes.append(classes.setdefault(record['class'], len(classes)))
+                collection_codes.append(collections.setdefault(record['collection'], len(collections)))
+                date_codes.append(dates.setdefault(record['date'], len(dates)))
+                try:
+                    point_ids.append(record['point_id'])
+                except TypeError:
+                    # Identifiers given by the user may not be integers.
+                    point_ids = list(point_ids)
+                    point_ids.append(record['point_id'])
+
+        return cls(
+            classes=list(classes),
+            collections=list(collections),
+            dates=list(dates),
+            class_codes=np.array(class_codes, dtype=np.int32),
+            collection_codes=np.array(collection_codes, dtype=np.int32),
+            date_codes=np.array(date_codes, dtype=np.int32),
+            point_ids=np.array(point_ids, dtype=np.int64 if isinstance(point_ids, array) else object),
+        )
+
+    @property
+    def trajectory(self) -> List[Dict[str, Any]]:
+        """Return the records of all trajectories as dictionaries."""
+        return list(self)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the number of bytes used by the record arrays."""
+        return sum(a.nbytes for a in (self.class_codes, self.collection_codes, self.date_codes, self.point_ids))
+
+    def df(self, **options: Any) -> "pd.DataFrame":
+        """Return the dataframe representation, with categorical ``class``, ``collection`` and ``date`` columns."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            'class': pd.Categorical.from_codes(self.class_codes, categories=self.classes),
+            'collection': pd.Categorical.from_codes(self.collection_codes, categories=self.collections),
+            'date': pd.Categorical.from_codes(self.date_codes, categories=self.dates),
+            'point_id': self.point_ids,
+        })
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the records of all trajectories."""
+        for c, cl, d, p in zip(self.class_codes.tolist(), self.collection_codes.tolist(),
+                               self.date_codes.tolist(), self.point_ids.tolist()):
+            yield {'class': self.classes[c], 'collection': self.collections[cl], 'date': self.dates[d], 'point_id': p}
+
+    def __len__(self) -> int:
+        """Return the number of records."""
+        return len(self.point_ids)
+
+    def __repr__(self) -> str:
+        """Return the CompactTrajectories object representation."""
+        return f'CompactTrajectories(records={len(self)}, points={len(np.unique(self.point_ids))})'
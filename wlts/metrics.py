@@ -0,0 +1,243 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Instrumentation events and a metrics collector for the WLTS clients.
+
+The clients report what they do to event hooks, callables invoked as
+``hook(event, data)``, where ``event`` is one of:
+
+- ``request_start``: ``op``, ``method`` and ``url`` of a request about to be sent.
+- ``request_end``: the same keys, with the ``status`` code (``None`` on failure),
+  the ``elapsed`` seconds, the ``bytes`` of the decoded response body, the ``wire_bytes``
+  received before decompression, the content ``encoding`` and the ``error``, if any.
+- ``retry``: ``op``, ``method``, ``url``, the ``attempt`` number, the ``delay`` in seconds
+  before it, and the ``status`` or the ``error`` that caused it.
+- ``cache``: the ``cache`` (``metadata`` or ``trajectory``), the ``op`` and whether it was a ``hit``.
+- ``parse``: the ``op`` and the ``elapsed`` seconds spent decoding a response.
+"""
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+#: The upper bounds, in seconds, of the buckets of the latency histograms.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """A cumulative histogram of observations, in the style of Prometheus."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        """Create a histogram.
+
+        Args:
+            buckets (Iterable[float]): The sorted upper bounds of the buckets.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Return the number of observations up to each bucket bound, ending with ``+Inf``."""
+        result, total = [], 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+
+        result.append((float('inf'), self.count))
+
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the histogram as a dictionary."""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': {_bound(bound): count for bound, count in self.cumulative()},
+        }
+
+
+class MetricsCollector:
+    """An event hook gathering metrics of the requests of WLTS clients.
+
+    It records, per operation (``trajectory``, ``describe_collection``,
+    ``list_collections``, ...), a latency histogram, the number of requests by
+    status code, the failed requests, the retries, the bytes received (compressed and decoded) and the
+    time spent decoding the responses, as well as the hits and misses of the caches.
+
+    Example:
+        .. doctest::
+            :skipif: WLTS_EXAMPLE_URL is None
+
+            >>> from wlts import *
+            >>> from wlts.metrics import MetricsCollector
+            >>> metrics = MetricsCollector()
+            >>> service = WLTS(WLTS_EXAMPLE_URL, hooks=[metrics])
+            >>> tj = service.tj(latitude=-12.0, longitude=-54.0, collections='mapbiomas-v6')
+            >>> print(metrics.to_prometheus())
+            # HELP wlts_request_duration_seconds ...
+    """
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        """Create a metrics collector.
+
+        Args:
+            buckets (Iterable[float]): The upper bounds, in seconds, of the buckets of the latency histograms.
+        """
+        self._buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard the metrics gathered so far."""
+        with self._lock:
+            self.latency: Dict[str, Histogram] = dict()
+            self.parse: Dict[str, Histogram] = dict()
+            self.status: Dict[Tuple[str, Optional[int]], int] = dict()
+            self.errors: Dict[str, int] = dict()
+            self.retries: Dict[str, int] = dict()
+            self.bytes: Dict[str, int] = dict()
+            self.wire_bytes: Dict[str, int] = dict()
+            self.cache: Dict[Tuple[str, str], int] = dict()
+
+    def __call__(self, event: str, data: Dict[str, Any]) -> None:
+        """Record an event of a WLTS client."""
+        op = data.get('op') or 'root'
+
+        with self._lock:
+            if event == 'request_end':
+                self._histogram(self.latency, op).observe(data['elapsed'])
+                key = (op, data.get('status'))
+                self.status[key] = self.status.get(key, 0) + 1
+                self.bytes[op] = self.bytes.get(op, 0) + (data.get('bytes') or 0)
+                self.wire_bytes[op] = self.wire_bytes.get(op, 0) + (data.get('wire_bytes') or 0)
+
+                if data.get('error') is not None:
+                    self.errors[op] = self.errors.get(op, 0) + 1
+            elif event == 'retry':
+                self.retries[op] = self.retries.get(op, 0) + 1
+            elif event == 'parse':
+                self._histogram(self.parse, op).observe(data['elapsed'])
+            elif event == 'cache':
+                key = (data['cache'], 'hit' if data['hit'] else 'miss')
+                self.cache[key] = self.cache.get(key, 0) + 1
+
+    def _histogram(self, histograms: Dict[str, Histogram], op: str) -> Histogram:
+        """Return the histogram of an operation, creating it on first use."""
+        histogram = histograms.get(op)
+
+        if histogram is None:
+            histogram = histograms[op] = Histogram(self._buckets)
+
+        return histogram
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a dictionary, indexed by operation."""
+        with self._lock:
+            operations = sorted(set(self.latency) | set(self.retries) | set(self.parse))
+
+            requests = dict()
+
+            for op in operations:
+                latency = self.latency.get(op)
+
+                requests[op] = {
+                    'latency': latency.to_dict() if latency is not None else Histogram(self._buckets).to_dict(),
+                    'status': {status: count for (name, status), count in self.status.items() if name == op},
+                    'errors': self.errors.get(op, 0),
+                    'retries': self.retries.get(op, 0),
+                    'bytes': self.bytes.get(op, 0),
+                    'wire_bytes': self.wire_bytes.get(op, 0),
+                }
+
+                if op in self.parse:
+                    requests[op]['parse'] = self.parse[op].to_dict()
+
+            cache: Dict[str, Dict[str, int]] = dict()
+
+            for (name, result), count in self.cache.items():
+                cache.setdefault(name, {'hit': 0, 'miss': 0})[result] = count
+
+            return {'requests': requests, 'cache': cache}
+
+    def to_prometheus(self, prefix: str = 'wlts') -> str:
+        """Return the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): The prefix of the metric names.
+        """
+        lines: List[str] = []
+
+        def header(name, kind, text):
+            lines.append(f'# HELP {prefix}_{name} {text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+
+        def histogram(name, histograms):
+            for op, hist in sorted(histograms.items()):
+                for bound, count in hist.cumulative():
+                    lines.append(f'{prefix}_{name}_bucket{{operation="{op}",le="{_bound(bound)}"}} {count}')
+
+                lines.append(f'{prefix}_{name}_sum{{operation="{op}"}} {hist.sum}')
+                lines.append(f'{prefix}_{name}_count{{operation="{op}"}} {hist.count}')
+
+        with self._lock:
+            header('request_duration_seconds', 'histogram', 'Duration of the requests to the WLTS service.')
+            histogram('request_duration_seconds', self.latency)
+
+            header('requests_total', 'counter', 'Requests to the WLTS service by status code.')
+            for (op, status), count in sorted(self.status.items(), key=lambda item: (item[0][0], item[0][1] or 0)):
+                lines.append(f'{prefix}_requests_total{{operation="{op}",status="{status or "error"}"}} {count}')
+
+            header('request_errors_total', 'counter', 'Requests to the WLTS service that failed without response.')
+            for op, count in sorted(self.errors.items()):
+                lines.append(f'{prefix}_request_errors_total{{operation="{op}"}} {count}')
+
+            header('retries_total', 'counter', 'Retries of requests to the WLTS service.')
+            for op, count in sorted(self.retries.items()):
+                lines.append(f'{prefix}_retries_total{{operation="{op}"}} {count}')
+
+            header('response_bytes_total', 'counter', 'Bytes of the decoded responses of the WLTS service.')
+            for op, count in sorted(self.bytes.items()):
+                lines.append(f'{prefix}_response_bytes_total{{operation="{op}"}} {count}')
+
+            header('response_wire_bytes_total', 'counter', 'Bytes received from the WLTS service, before decompression.')
+            for op, count in sorted(self.wire_bytes.items()):
+                lines.append(f'{prefix}_response_wire_bytes_total{{operation="{op}"}} {count}')
+
+            header('parse_duration_seconds', 'histogram', 'Time spent decoding the responses of the WLTS service.')
+            histogram('parse_duration_seconds', self.parse)
+
+            header('cache_requests_total', 'counter', 'Lookups in the caches of the WLTS client.')
+            for (name, result), count in sorted(self.cache.items()):
+                lines.append(f'{prefix}_cache_requests_total{{cache="{name}",result="{result}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _bound(bound: float) -> str:
+    """Format a bucket bound as in Prometheus."""
+    return '+Inf' if bound == float('inf') else repr(float(bound))
@@ -0,0 +1,160 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Readers of point sets used as input of trajectory queries."""
+import os
+from typing import Any, Iterator, Optional, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+#: File extensions read with pandas.read_csv.
+_CSV = ('.csv', '.txt', '.tsv')
+
+#: File extensions read with geopandas.read_file.
+_VECTOR = ('.geojson', '.json', '.gpkg', '.shp', '.fgb')
+
+#: File extensions of (Geo)Parquet files.
+_PARQUET = ('.parquet', '.geoparquet', '.pq')
+
+
+def _validate(lat: np.ndarray, long: np.ndarray, offset: int = 0) -> None:
+    """Check the coordinates of a block of points at once.
+
+    Raises:
+        ValueError: If a coordinate is not a number or is out of range.
+    """
+    for name, values, limit in (('latitude', lat, 90.0), ('longitude', long, 180.0)):
+        invalid = ~np.isfinite(values) | (np.abs(values) > limit)
+
+        if invalid.any():
+            i = int(np.argmax(invalid))
+            raise ValueError(f"{name} of point {offset + i} is invalid or out-of range "
+                             f"[-{limit:g},{limit:g}]: {values[i]}")
+
+
+def _from_columns(df: pd.DataFrame, latitude: str, longitude: str, point_id: Optional[str],
+                  offset: int = 0) -> Iterator[Tuple[Any, ...]]:
+    """Yield the points of a dataframe block with coordinates in columns."""
+    try:
+        lat = pd.to_numeric(df[latitude]).to_numpy(dtype=float)
+        long = pd.to_numeric(df[longitude]).to_numpy(dtype=float)
+    except (ValueError, TypeError):
+        raise ValueError("Arguments latitude and longitude must be numeric.")
+
+    _validate(lat, long, offset)
+
+    if point_id is None:
+        yield from zip(lat.tolist(), long.tolist())
+    else:
+        yield from zip(lat.tolist(), long.tolist(), df[point_id].tolist())
+
+
+def _from_geometry(gdf: gpd.GeoDataFrame, point_id: Optional[str]) -> Iterator[Tuple[Any, ...]]:
+    """Yield the points of a geodataframe, reprojected to EPSG:4326 if needed."""
+    if gdf.crs is not None and not gdf.crs.equals('EPSG:4326'):
+        gdf = gdf.to_crs('EPSG:4326')
+
+    if not (gdf.geometry.geom_type == 'Point').all():
+        raise ValueError("The geometries must be points!")
+
+    frame = pd.DataFrame({'latitude': gdf.geometry.y.to_numpy(), 'longitude': gdf.geometry.x.to_numpy()})
+
+    if point_id is not None:
+        frame['point_id'] = gdf[point_id].to_numpy()
+
+    yield from _from_columns(frame, 'latitude', 'longitude', 'point_id' if point_id is not None else None)
+
+
+def _from_parquet(path: str, latitude: str, longitude: str, point_id: Optional[str],
+                  chunk_size: int) -> Iterator[Tuple[Any, ...]]:
+    """Yield the points of a Parquet file, reading it in batches, or of a GeoParquet file."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("You should install PyArrow!")
+
+    parquet = pq.ParquetFile(path)
+
+    if b'geo' in (parquet.schema_arrow.metadata or {}):
+        yield from _from_geometry(gpd.read_parquet(path), point_id)
+        return
+
+    columns = [latitude, longitude] + ([point_id] if point_id is not None else [])
+    offset = 0
+
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+        yield from _from_columns(batch.to_pandas(), latitude, longitude, point_id, offset)
+        offset += batch.num_rows
+
+
+def read_points(source: Any, latitude: str = 'latitude', longitude: str = 'longitude',
+                point_id: Optional[str] = None, chunk_size: int = 100000,
+                **options: Any) -> Iterator[Tuple[Any, ...]]:
+    """Read the locations of a point set.
+
+    The coordinates are validated in blocks with NumPy. CSV and Parquet files
+    are read in blocks of ``chunk_size`` rows, so the points can be streamed into
+    :meth:`wlts.WLTS.iter_trajectories` without loading the whole file.
+
+    Args:
+        source: A path (CSV, GeoJSON, GeoPackage, Shapefile, Parquet or GeoParquet), a file object
+            with CSV content, a ``pandas.DataFrame`` or a ``geopandas.GeoDataFrame`` of points.
+        latitude (str): The name of the latitude column, for sources without geometries.
+        longitude (str): The name of the longitude column, for sources without geometries.
+        point_id (str, optional): The name of a column with the identifiers of the points.
+        chunk_size (int): The number of rows read at once from CSV and Parquet files.
+        options: Extra keyword arguments for ``pandas.read_csv`` or ``geopandas.read_file``.
+
+    Returns:
+        Iterator: ``(latitude, longitude)`` pairs, or ``(latitude, longitude, point_id)`` triples
+        when ``point_id`` is given.
+
+    Raises:
+        ValueError: If a coordinate is invalid or out of range, or the geometries are not points.
+    """
+    if isinstance(source, gpd.GeoDataFrame):
+        yield from _from_geometry(source, point_id)
+        return
+
+    if isinstance(source, pd.DataFrame):
+        yield from _from_columns(source, latitude, longitude, point_id)
+        return
+
+    extension = os.path.splitext(str(source))[1].lower() if isinstance(source, (str, os.PathLike)) else '.csv'
+
+    if extension in _PARQUET:
+        yield from _from_parquet(str(source), latitude, longitude, point_id, chunk_size)
+        return
+
+    if extension in _VECTOR:
+        yield from _from_geometry(gpd.read_file(source, **options), point_id)
+        return
+
+    if extension not in _CSV:
+        raise ValueError(f"Unsupported point file: {source}")
+
+    offset = 0
+    columns = [latitude, longitude] + ([point_id] if point_id is not None else [])
+
+    if extension == '.tsv':
+        options.setdefault('sep', '\t')
+
+    for chunk in pd.read_csv(source, usecols=columns, chunksize=chunk_size, **options):
+        yield from _from_columns(chunk, latitude, longitude, point_id, offset)
+        offset += len(chunk)
@@ -16,11 +16,17 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
 #
 """A class that represents Trajectories in WLTS."""
-from typing import Any, Dict
-
-import pandas as pd
+from typing import TYPE_CHECKING, Any, Dict, List
 
+from .trajectory import _geodataframe
 from .utils import Utils
+from .writer import write_trajectories
+
+if TYPE_CHECKING:
+    import geopandas as gpd
+    import pandas as pd
+
+    from .compact import CompactTrajectories
 
 
 class Trajectories(dict):
@@ -38,11 +44,93 @@ class Trajectories(dict):
         """
         super().__init__(data or {})
 
+    @property
+    def errors(self) -> List[Dict[str, Any]]:
+        """Return the points whose trajectory could not be retrieved.
+
+        Each failure has the ``point_id``, ``latitude``, ``longitude`` and ``error`` message.
+        They are only recorded when the trajectories are retrieved with ``errors='collect'``.
+        """
+        return self.get('errors', [])
+
     def _repr_html_(self) -> str:
         """Display the trajectories as HTML for IPython rich display."""
         return Utils.render_html('trajectory.html', trajectories=self)
 
-    def df(self, **options: Any) -> pd.DataFrame:
-        """Return the dataframe representation of the Trajectories object."""
-        trjs_df = [trj.df() for trj in self['trajectories']]
-        return pd.concat(trjs_df, axis=0).reset_index(drop=True)
\ No newline at end of file
+    def df(self, categorical: bool = True, **options: Any) -> "pd.DataFrame":
+        """Return the dataframe representation of the Trajectories object.
+
+        The records of all trajectories are gathered column by column and the
+        dataframe is built once, instead of concatenating one dataframe per point.
+
+        Args:
+            categorical (bool): Use the ``category`` dtype for the ``class`` and ``collection`` columns.
+        """
+        import pandas as pd
+
+        columns: Dict[str, List[Any]] = dict()
+        size = 0
+
+        for trj in self['trajectories']:
+            for record in trj.trajectory:
+                for key, value in record.items():
+                    column = columns.get(key)
+
+                    if column is None:
+                        column = columns[key] = [None] * size
+
+                    column.append(value)
+
+                size += 1
+
+                # Pad the columns missing in this record.
+                for column in columns.values():
+                    if len(column) < size:
+                        column.append(None)
+
+        if categorical:
+            for key in ('class', 'collection'):
+                if key in columns:
+                    columns[key] = pd.Categorical(columns[key])
+
+        return pd.DataFrame(columns)
+
+    def geodf(self, **options: Any) -> "gpd.GeoDataFrame":
+        """Return the geodataframe representation of the Trajectories object.
+
+        The trajectories must have been retrieved with ``geometry=True``.
+        """
+        return _geodataframe(self.df(**options))
+
+    def compact(self) -> "CompactTrajectories":
+        """Return the compact, array-backed, representation of the Trajectories object."""
+        from .compact import CompactTrajectories
+
+        return CompactTrajectories.from_trajectories(self['trajectories'])
+
+    def to_parquet(self, path: Any, geometry: bool = False, **options: Any) -> int:
+        """Write the records of the trajectories to a Parquet file, in row groups.
+
+        Args:
+            path: The path, or a writable binary file object, of the output file.
+            geometry (bool): Write a GeoParquet file, with the ``geom`` column encoded as WKB.
+                The trajectories must have been retrieved with ``geometry=True``.
+            options: Extra keyword arguments for :class:`wlts.writer.TrajectoryWriter`,
+                such as ``row_group_size`` or ``compression``.
+
+        Returns:
+            int: The number of records written.
+        """
+        return write_trajectories(self['trajectories'], path, 'geoparquet' if geometry else 'parquet', **options)
+
+    def to_arrow(self, path: Any, **options: Any) -> int:
+        """Write the records of the trajectories to an Arrow IPC (Feather v2) file, in record batches.
+
+        Args:
+            path: The path, or a writable binary file object, of the output file.
+            options: Extra keyword arguments for :class:`wlts.writer.TrajectoryWriter`, such as ``row_group_size``.
+
+        Returns:
+            int: The number of records written.
+        """
+        return write_trajectories(self['trajectories'], path, 'arrow', **options)
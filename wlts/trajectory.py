@@ -16,14 +16,48 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
 #
 """A class that represents Trajectory in WLTS."""
-from typing import Any, Dict, List
-
-import geopandas as gpd
-import pandas as pd
-from shapely.geometry import shape
+import json
+from typing import TYPE_CHECKING, Any, Dict, List
 
 from .utils import Utils
 
+if TYPE_CHECKING:
+    import geopandas as gpd
+    import pandas as pd
+
+
+def _geodataframe(df: "pd.DataFrame") -> "gpd.GeoDataFrame":
+    """Convert a trajectory dataframe with GeoJSON geometries in the ``geom`` column into a geodataframe.
+
+    Pixels shared by several records (e.g., the same location in different
+    dates) have identical geometries, so each distinct geometry is decoded
+    only once, in a single vectorized call when shapely 2 is available.
+    """
+    import geopandas as gpd
+    import pandas as pd
+
+    try:
+        from shapely import from_geojson
+    except ImportError:  # shapely < 2.0
+        from shapely.geometry import shape
+        from_geojson = None
+
+    if 'geom' not in df or df['geom'].isna().any():
+        raise RuntimeError("Geometry field not exist! Verify if you pass geometry=True in service.trj!")
+
+    keys = [json.dumps(geom, sort_keys=True) for geom in df['geom']]
+    codes, unique = pd.factorize(pd.Series(keys, dtype=object))
+
+    if from_geojson is not None:
+        geometries = from_geojson(unique.to_numpy(dtype=object))
+    else:
+        geometries = [shape(json.loads(key)) for key in unique]
+
+    df = df.copy()
+    df['geom'] = gpd.GeoSeries(geometries).take(codes).to_numpy()
+
+    return gpd.GeoDataFrame(df, geometry='geom', crs='EPSG:4326')
+
 
 class Trajectory(dict):
     """A class that represents a trajectory in WLTS.
@@ -51,22 +85,15 @@ class Trajectory(dict):
         """Return the query."""
         return self['query']
 
-    def df(self, **options) -> pd.DataFrame:
+    def df(self, **options) -> "pd.DataFrame":
         """Return the dataframe representation of the Trajectory object."""
+        import pandas as pd
+
         return pd.DataFrame(self.trajectory)
 
-    def geodf(self, **options) -> gpd.GeoDataFrame:
+    def geodf(self, **options) -> "gpd.GeoDataFrame":
         """Return the geodataframe representation of the Trajectory object."""
-        if not all(['geom' in i for i in self.trajectory]):
-            raise RuntimeError("Geometry field not exist! Verify if you pass geometry=True in service.trj!")
-        gdf = gpd.GeoDataFrame(self.trajectory)
-        
-        gdf["geom"] = gdf.apply(lambda x: shape(x["geom"]), axis=1)
-
-        gdf.set_geometry("geom", inplace=True)
-        gdf.set_crs("EPSG:4326", inplace=True)
-
-        return gdf
+        return _geodataframe(self.df())
 
     def _repr_html_(self) -> str:
         """Display the trajectory as HTML.
@@ -0,0 +1,207 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""HTTP transports with retries and rate limiting for the WLTS clients."""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Iterable, Optional
+
+import httpx
+
+#: Status codes of transient server errors retried by default.
+RETRY_STATUS = (429, 502, 503, 504)
+
+
+class RateLimiter:
+    """A token bucket limiting the rate of requests shared by several threads or tasks.
+
+    The bucket holds up to ``burst`` tokens and is refilled with ``rate`` tokens
+    per second. Each request consumes a token, waiting for it if the bucket is empty.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None,
+                 timer: Callable[[], float] = time.monotonic) -> None:
+        """Create a rate limiter.
+
+        Args:
+            rate (float): The maximum sustained number of requests per second.
+            burst (int, optional): The maximum number of requests issued at once. Defaults to ``1``.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive!")
+
+        self.rate = rate
+        self.burst = burst or 1
+        self._timer = timer
+        self._tokens = float(self.burst)
+        self._updated = timer()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long, in seconds, the caller must wait before using it."""
+        with self._lock:
+            now = self._timer()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Wait for a token."""
+        delay = self._reserve()
+
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self) -> None:
+        """Wait for a token without blocking the event loop."""
+        delay = self._reserve()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _RetryPolicy:
+    """The retry decisions shared by the synchronous and asynchronous transports."""
+
+    def __init__(self, transport, retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 60.0,
+                 retry_status: Iterable[int] = RETRY_STATUS, rate_limiter: Optional[RateLimiter] = None,
+                 on_retry: Optional[Callable[[httpx.Request, int, float, Any], None]] = None) -> None:
+        """Wrap a transport.
+
+        Args:
+            transport: The transport that sends the requests.
+            retries (int): The maximum number of retries of a request.
+            backoff_factor (float): The base, in seconds, of the exponential backoff between retries.
+            max_backoff (float): The maximum delay, in seconds, between retries.
+            retry_status (Iterable[int]): The response status codes that are retried.
+            rate_limiter (RateLimiter, optional): Limit the rate of the requests, including the retries.
+            on_retry (callable, optional): Called as ``on_retry(request, attempt, delay, cause)`` before each
+                retry, where ``cause`` is the response or the exception of the failed attempt.
+        """
+        self._transport = transport
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_status = frozenset(retry_status)
+        self.rate_limiter = rate_limiter
+        self.on_retry = on_retry
+
+    def _delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Return the delay, in seconds, before the given retry attempt.
+
+        The ``Retry-After`` header of the response is honored. Otherwise, the
+        delay is drawn at random up to the exponential backoff ("full jitter").
+        """
+        retry_after = response.headers.get("retry-after") if response is not None else None
+
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+
+            if delay is not None:
+                return min(max(delay, 0.0), self.max_backoff)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+
+class RetryTransport(_RetryPolicy, httpx.BaseTransport):
+    """A transport that retries transient failures with exponential backoff and jitter.
+
+    Connection errors, timeouts and responses with a status in ``retry_status``
+    are retried up to ``retries`` times. After the last retry, the error is
+    raised or the response is returned as is.
+    """
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying it on transient failures."""
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as error:
+                if attempt >= self.retries:
+                    raise
+
+                delay, cause = self._delay(attempt), error
+            else:
+                if response.status_code not in self.retry_status or attempt >= self.retries:
+                    return response
+
+                delay, cause = self._delay(attempt, response), response
+                response.close()
+
+            attempt += 1
+
+            if self.on_retry is not None:
+                self.on_retry(request, attempt, delay, cause)
+
+            time.sleep(delay)
+
+    def close(self) -> None:
+        """Close the wrapped transport."""
+        self._transport.close()
+
+
+class AsyncRetryTransport(_RetryPolicy, httpx.AsyncBaseTransport):
+    """The asynchronous version of :class:`RetryTransport`."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request, retrying it on transient failures."""
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire()
+
+            try:
+                response = await self._transport.handle_async_request(request)
+            except httpx.TransportError as error:
+                if attempt >= self.retries:
+                    raise
+
+                delay, cause = self._delay(attempt), error
+            else:
+                if response.status_code not in self.retry_status or attempt >= self.retries:
+                    return response
+
+                delay, cause = self._delay(attempt, response), response
+                await response.aclose()
+
+            attempt += 1
+
+            if self.on_retry is not None:
+                self.on_retry(request, attempt, delay, cause)
+
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._transport.aclose()
@@ -16,13 +16,66 @@
 # along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
 #
 """Utility functions for WLTS client library."""
-from typing import Any
+import json
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable
 
-import jinja2
-from pkg_resources import resource_filename
+try:
+    from importlib.resources import files
+except ImportError:  # Python < 3.9
+    files = None
 
-templateLoader = jinja2.FileSystemLoader(searchpath=resource_filename(__name__, 'templates/'))
-templateEnv = jinja2.Environment(loader=templateLoader)
+if TYPE_CHECKING:
+    import jinja2
+
+
+def _json_decoder() -> Callable[[bytes], Any]:
+    """Return the fastest JSON decoder installed: orjson, msgspec or the standard library.
+
+    All of them decode into plain dictionaries and lists.
+    """
+    try:
+        import orjson
+
+        return orjson.loads
+    except ImportError:
+        pass
+
+    try:
+        import msgspec
+    except ImportError:
+        return json.loads
+
+    decoder = msgspec.json.Decoder()
+
+    def decode(content):
+        try:
+            return decoder.decode(content)
+        except msgspec.DecodeError as error:
+            raise ValueError(str(error)) from error
+
+    return decode
+
+
+#: Decode a JSON document given as bytes or text.
+json_loads = _json_decoder()
+
+
+def _templates_path() -> str:
+    """Return the directory of the HTML templates shipped with the package."""
+    if files is None:
+        return os.path.join(os.path.dirname(__file__), 'templates')
+
+    return str(files(__package__) / 'templates')
+
+
+@lru_cache(maxsize=None)
+def _template_env() -> "jinja2.Environment":
+    """Build the Jinja2 environment on first use."""
+    import jinja2
+
+    return jinja2.Environment(loader=jinja2.FileSystemLoader(searchpath=_templates_path()))
 
 
 class Utils:
@@ -40,5 +93,5 @@ class Utils:
         Returns:
             str: The rendered HTML as a string.
         """
-        template = templateEnv.get_template(template_name)
+        template = _template_env().get_template(template_name)
         return template.render(**kwargs)
\ No newline at end of file
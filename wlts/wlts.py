@@ -20,20 +20,21 @@
 This module introduces a class named ``WLTS`` that can be used to retrieve
 trajectories for a given location.
 """
-import json
-from typing import Any, Dict, Iterator, Optional
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
-import lccs
-import requests
 
+from .base import _BATCH_UNSUPPORTED, BaseWLTS, _chunks, _validate_lat_long
 from .collection import Collections
 from .trajectories import Trajectories
 from .trajectory import Trajectory
+from .transport import RetryTransport
 from .utils import Utils
 
 
-class WLTS:
+class WLTS(BaseWLTS):
     """This class implement a client for WLTS.
 
     .. note::
@@ -41,27 +42,78 @@ class WLTS:
         `WLTS specification <https://github.com/brazil-data-cube/wlts-spec>`_.
     """
 
-    def __init__(self, url, lccs_url=None, access_token=None):
+    def __init__(self, url, lccs_url=None, access_token=None, **options):
         """Create a WLTS client attached to the given host address (an URL).
 
+        The client keeps a pool of persistent HTTP connections which is shared by
+        all requests issued through it. Use :meth:`close` or the ``with`` statement
+        to release the connections once the client is no longer needed.
+
         Args:
             url (str): URL for the WLTS server.
             lccs_url (str, optional): URL for the LCCS server.
             access_token (str, optional): Authentication token to be used with the WLTS server.
+
+        Keyword Args:
+            timeout (float, optional): Timeout, in seconds, for the HTTP requests. Defaults to 30 seconds.
+            max_connections (int, optional): Maximum number of connections kept by the pool.
+            max_keepalive_connections (int, optional): Maximum number of idle connections kept alive.
+            keepalive_expiry (float, optional): Time, in seconds, an idle connection is kept alive.
+            http2 (bool, optional): Enable HTTP/2 support. Requires the ``h2`` package.
+            cache_ttl (float, optional): Time, in seconds, the service metadata (list of collections, supported languages and
+                collection descriptions) is cached. Use ``None`` to cache it until :meth:`clear_cache` is called.
+                Defaults to 5 minutes.
+            cache_maxsize (int, optional): Maximum number of cached metadata documents. Use ``0`` to disable the cache.
+            trajectory_cache (str or wlts.cache.TrajectoryCache, optional): A persistent cache, or the path of its
+                database, consulted before querying the server for a trajectory.
+            retries (int, optional): Maximum number of retries of a request that failed with a connection error,
+                a timeout or a transient server error (429, 502, 503, 504). Defaults to 3. Use ``0`` to disable.
+            backoff_factor (float, optional): Base, in seconds, of the exponential backoff between retries.
+                The ``Retry-After`` header sent by the server takes precedence. Defaults to 0.5.
+            rate_limit (float or wlts.transport.RateLimiter, optional): Maximum number of requests per second
+                issued by the client, or a rate limiter shared with other clients.
+            hooks (callable or list, optional): Event hooks called as ``hook(event, data)`` for the start and end
+                of each request, its retries, the cache lookups and the decoding of the responses.
+                See :mod:`wlts.metrics`, whose :class:`~wlts.metrics.MetricsCollector` is such a hook.
+            compression (bool, optional): Ask the server for compressed responses, in every coding httpx
+                can decode (gzip and deflate, plus br and zstd when ``brotli`` and ``zstandard`` are installed).
+                Defaults to True.
+            options: Extra keyword arguments for the underlying :class:`httpx.Client`
+                (``transport``, ``verify``, ``proxy``, etc).
         """
-        #: str: URL for the WLTS server.
-        self._url = url if url[-1] != "/" else url[0:-1]
+        super().__init__(url, lccs_url=lccs_url, access_token=access_token, **options)
 
-        #: str: Authentication token to be used with the WLTS server.
-        self._access_token: str = access_token or ""
-        self._headers: Dict[str, str] = (
-            {"x-api-key": self._access_token} if self._access_token else {}
-        )
+        self._client_lock = threading.Lock()
 
-        #: str: URL for the LCCS server.
-        self._lccs_url = (
-            lccs_url if lccs_url else "https://brazildatacube.dpi.inpe.br/lccs/"
-        )
+    @property
+    def client(self) -> httpx.Client:
+        """Return the HTTP client used to communicate with the WLTS server.
+
+        The client is created on first use and reused by all subsequent requests.
+        """
+        if self._client is None or self._client.is_closed:
+            with self._client_lock:
+                if self._client is None or self._client.is_closed:
+                    self._client = httpx.Client(
+                        **self._http_client_options(RetryTransport, httpx.HTTPTransport)
+                    )
+
+        return self._client
+
+    def close(self):
+        """Close the HTTP client and release the pooled connections."""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def __enter__(self):
+        """Enter the runtime context of the WLTS client."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the WLTS client when leaving the runtime context."""
+        self.close()
 
     @property
     def collections(self):
@@ -77,23 +129,26 @@ class WLTS:
         """
         return self._list_collections()
 
-    def _support_language(self):
-        """Returns the languages supported by the service."""
-        import enum
+    def _support_language(self, refresh=False):
+        """Returns the languages supported by the service.
 
-        response = requests.get(f"{self._url}/")
+        The languages are retrieved from the service root on first use and
+        kept in the metadata cache.
 
-        response.raise_for_status()
+        Args:
+            refresh (bool): Retrieve the languages from the service even if they are cached.
+        """
+        languages = None if refresh else self._cache_get(("supported_language",))
 
-        data = response.json()
+        if languages is None:
+            data = self._get(self._url, op="")
+            languages = self._language_enum(data)
+            self._cache.set(("supported_language",), languages)
 
-        return enum.Enum(
-            "Language",
-            {i["language"]: i["language"] for i in data["supported_language"]},
-            type=str,
-        )
+        return languages
 
-    def tj(self, latitude, longitude, **options):
+    def tj(self, latitude, longitude, max_workers=None, batch_size=None, errors="raise", checkpoint=None,
+           deduplicate=False, snap=None, **options):
         """Retrieve the trajectory for a given location and time interval.
 
         Keyword Args:
@@ -101,6 +156,24 @@ class WLTS:
             or any sequence of strings. If omitted, the values for all collections are retrieved.
             longitude (int/float/list): A longitude value according to EPSG:4326.
             latitude (int/float/list): A latitude value according to EPSG:4326.
+            max_workers (:obj:`int`, optional): The maximum number of concurrent requests used
+            when ``latitude`` and ``longitude`` are lists. By default, the points are retrieved one at a time.
+            batch_size (:obj:`int`, optional): Pack up to ``batch_size`` points in each request, using the
+            batch trajectory endpoint of the server. If the server does not support it, one request per point is used.
+            errors (:obj:`str`, optional): What to do when the trajectory of one of the points can not be retrieved:
+            ``raise`` the error (default), or ``collect`` it in the ``errors`` of the returned ``Trajectories``
+            and keep the trajectories of the other points.
+            checkpoint (:obj:`str` or :obj:`wlts.checkpoint.Checkpoint`, optional): A file recording the
+            trajectories as they are retrieved. Running the same query again with the same file only
+            retrieves the points missing in it. A file written by a query with other options raises ``ValueError``.
+            deduplicate (:obj:`bool`, optional): Query the repeated locations only once.
+            snap (:obj:`str`, :obj:`float` or :obj:`wlts.collection.Collections`, optional): Snap the points
+            to the center of their pixel before removing the repeated locations, so each pixel is queried once.
+            The pixel grid is given by a collection (its name or metadata), from its spatial extent and
+            ``spatial_resolution``, or by a resolution in degrees. Snapping to a collection grid requires its
+            metadata to hold a ``spatial_resolution`` with ``x`` and ``y`` (or ``value``) and a ``unit`` in degrees,
+            otherwise ``ValueError`` is raised. The records of each point keep its ``point_id``, while the query
+            of its trajectory holds the location actually queried.
             start_date (:obj:`str`, optional): The begin of a time interval.
             end_date (:obj:`str`, optional): The end of a time interval.
             geometry (:obj:`str`, optional): A string that accepted True of False.
@@ -122,100 +195,332 @@ class WLTS:
                 >>> ts.trajectory
                 [{'class': 'Formação Florestal', 'collection': 'mapbiomas-v6', 'date': '2007'}, ...]
         """
+        self._check_options(options)
+
+        if "language" in options:
+            self._check_language(options["language"], self._support_language())
+
+        if type(latitude) != list and type(longitude) != list:
+            _validate_lat_long(latitude, longitude)
+
+            trajectory = Trajectory(self._point_trajectory(latitude, longitude, 1, **options))
+
+            if "target_system" in options:
+                return self.harmonize(trajectory, options["target_system"])
 
-        def validate_lat_long(lat, long):
-            if (type(lat) not in (float, int)) or (type(long) not in (float, int)):
-                raise ValueError("Arguments latitude and longitude must be numeric.")
+            return trajectory
 
-            if (lat < -90.0) or (lat > 90.0):
-                raise ValueError("latitude is out-of range [-90,90]!")
+        points = list(zip(latitude, longitude))
 
-            if (long < -180.0) or (long > 180.0):
-                raise ValueError("longitude is out-of range [-180,180]!")
+        for lat, long in points:
+            _validate_lat_long(lat, long)
 
-        invalid_parameters = set(options) - {
-            "start_date",
-            "end_date",
-            "collections",
-            "geometry",
-            "target_system",
-            "language",
-        }
+        failures, on_error = self._error_collector(errors)
 
-        if invalid_parameters:
-            raise AttributeError("invalid parameter(s): {}".format(invalid_parameters))
+        query_points, owners = points, None
+
+        if deduplicate or snap is not None:
+            grid = self._grid(self[snap] if isinstance(snap, str) else snap)
+            query_points, owners = self._distinct_points(points, grid)
+
+        with self._open_checkpoint(checkpoint, options) as cp:
+            result = list(self._iter_points(
+                enumerate(query_points, start=1), max_workers, options, batch_size, cp, on_error
+            ))
+
+        if owners is not None:
+            result, failures = self._fan_out(points, owners, result, failures)
+
+        result = Trajectories({"trajectories": result})
+
+        if errors == "collect":
+            result["errors"] = sorted(failures, key=lambda failure: failure["point_id"])
+
+        if "target_system" in options:
+            return self.harmonize(result, options["target_system"])
+
+        return result
+
+    def iter_trajectories(self, points, chunk_size=None, max_workers=None, batch_size=None, on_error=None,
+                          checkpoint=None, **options):
+        """Retrieve the trajectories of a sequence of locations as a stream.
+
+        Unlike :meth:`tj`, the trajectories are yielded as soon as they are
+        retrieved, and the points are consumed lazily, so any iterable of
+        coordinates can be used, including a generator reading a file.
+
+        Args:
+            points (iterable): An iterable of ``(latitude, longitude)`` pairs according to EPSG:4326,
+            or of ``(latitude, longitude, point_id)`` triples carrying the identifier of each point.
+            chunk_size (:obj:`int`, optional): If given, yield lists with up to ``chunk_size``
+            trajectories instead of single trajectories.
+            max_workers (:obj:`int`, optional): The maximum number of concurrent requests.
+            By default, the points are retrieved one at a time.
+            batch_size (:obj:`int`, optional): Pack up to ``batch_size`` points in each request, using the
+            batch trajectory endpoint of the server. If the server does not support it, one request per point is used.
+            on_error (:obj:`callable`, optional): If given, a point whose trajectory can not be retrieved is
+            reported as ``on_error(point_id, (latitude, longitude), error)`` and skipped, instead of stopping the stream.
+            checkpoint (:obj:`str` or :obj:`wlts.checkpoint.Checkpoint`, optional): A file recording the
+            trajectories as they are retrieved. Streaming the same points again with the same file only
+            retrieves the points missing in it.
+
+        Keyword Args:
+            collections (optional): A string with collections names separated by commas,
+            or any sequence of strings. If omitted, the values for all collections are retrieved.
+            start_date (:obj:`str`, optional): The begin of a time interval.
+            end_date (:obj:`str`, optional): The end of a time interval.
+            geometry (:obj:`str`, optional): A string that accepted True of False.
+            language (:obj:`str`, optional): The language of classes.
+
+        Returns:
+            Iterator[Trajectory]: The trajectory of each point, in the order of the points.
+            The records of the n-th point are tagged with ``point_id`` n, starting at 1,
+            unless the point carries its own identifier.
+
+        Example:
+
+            Retrieves the trajectories of points produced by a generator:
+
+            .. doctest::
+                :skipif: WLTS_EXAMPLE_URL is None
+
+                >>> from wlts import *
+                >>> service = WLTS(WLTS_EXAMPLE_URL)
+                >>> points = ((-12.0 - i * 0.01, -54.0) for i in range(100))
+                >>> for tj in service.iter_trajectories(points, collections='mapbiomas-v6', max_workers=4):
+                ...     records = tj.trajectory
+        """
+        yield from self._stream(self._identified(points), chunk_size, max_workers, batch_size, on_error,
+                                checkpoint, options)
+
+    def tj_from(self, source, latitude="latitude", longitude="longitude", point_id=None, max_workers=None,
+                batch_size=None, errors="raise", checkpoint=None, **options):
+        """Retrieve the trajectories of the points read from a file or a dataframe.
+
+        The points are read in blocks and their coordinates validated at once with NumPy
+        (see :func:`wlts.points.read_points`), then streamed into the retrieval, so the
+        point set is never held as Python lists.
+
+        Args:
+            source: A path to a CSV, GeoJSON, GeoPackage, Shapefile, Parquet or GeoParquet file,
+            a file object with CSV content, a ``pandas.DataFrame`` or a ``geopandas.GeoDataFrame`` of points.
+            latitude (:obj:`str`, optional): The name of the latitude column, for sources without geometries.
+            longitude (:obj:`str`, optional): The name of the longitude column, for sources without geometries.
+            point_id (:obj:`str`, optional): The name of a column whose values are used as the ``point_id``
+            of the records, instead of the position of the point.
+            max_workers (:obj:`int`, optional): The maximum number of concurrent requests.
+            batch_size (:obj:`int`, optional): Pack up to ``batch_size`` points in each request.
+            errors (:obj:`str`, optional): ``raise`` the error of a point (default), or ``collect`` it
+            in the ``errors`` of the returned ``Trajectories``.
+            checkpoint (:obj:`str` or :obj:`wlts.checkpoint.Checkpoint`, optional): A file recording the
+            trajectories as they are retrieved.
+
+        Keyword Args:
+            collections (optional): A string with collections names separated by commas,
+            or any sequence of strings. If omitted, the values for all collections are retrieved.
+            start_date (:obj:`str`, optional): The begin of a time interval.
+            end_date (:obj:`str`, optional): The end of a time interval.
+            geometry (:obj:`str`, optional): A string that accepted True of False.
+            language (:obj:`str`, optional): The language of classes.
+
+        Returns:
+            Trajectories: The trajectories of the points, in the order of the source.
+
+        Example:
+
+            Retrieves the trajectories of the points of a CSV file:
+
+            .. doctest::
+                :skipif: WLTS_EXAMPLE_URL is None
+
+                >>> from wlts import *
+                >>> service = WLTS(WLTS_EXAMPLE_URL)
+                >>> tj = service.tj_from('points.csv', point_id='id', collections='mapbiomas-v6', max_workers=4)
+        """
+        from .points import read_points
+
+        failures, on_error = self._error_collector(errors)
+
+        positions = dict()
+        points = self._numbered(
+            self._identified(read_points(source, latitude, longitude, point_id), validate=False), positions
+        )
+
+        result = Trajectories({"trajectories": list(self._stream(
+            points, None, max_workers, batch_size, on_error, checkpoint, options
+        ))})
+
+        if errors == "collect":
+            # The points fail in the order their requests finish: report them in the order of the source.
+            result["errors"] = sorted(failures, key=lambda failure: positions[failure["point_id"]])
+
+        return result
+
+    def _stream(self, points, chunk_size, max_workers, batch_size, on_error, checkpoint, options):
+        """Retrieve the trajectories of ``(point_id, (latitude, longitude))`` items as a stream."""
+        self._check_options(options)
 
         if "language" in options:
-            self._support_l = self._support_language()
-            if options["language"] in [e.value for e in self._support_l]:
-                pass
+            self._check_language(options["language"], self._support_language())
+
+        with self._open_checkpoint(checkpoint, options) as cp:
+            result = self._iter_points(points, max_workers, options, batch_size, cp, on_error)
+
+            if "target_system" in options:
+                result = (self.harmonize(tj, options["target_system"]) for tj in result)
+
+            if chunk_size:
+                yield from _chunks(result, chunk_size)
             else:
-                s = ", ".join([e for e in self.allowed_language])
-                raise KeyError(f"Language not supported! Use: {s}")
+                yield from result
 
-        if type(latitude) != list and type(longitude) != list:
-            validate_lat_long(latitude, longitude)
+    def _iter_points(self, points, max_workers, options, batch_size=None, checkpoint=None, on_error=None):
+        """Retrieve the trajectories of ``(point_id, (latitude, longitude))`` items, keeping their order.
 
-            data = self._trajectory(
-                **{"latitude": latitude, "longitude": longitude, **options}
-            )
+        With ``batch_size``, the points are packed into batch requests. At most
+        ``2 * max_workers`` requests are submitted ahead of the trajectory being
+        yielded, which bounds the memory used by long streams.
+
+        The points found in the ``checkpoint`` are restored instead of retrieved,
+        and the retrieved ones are recorded in it. With ``on_error``, a point that
+        could not be retrieved is reported as ``on_error(point_id, (latitude, longitude), error)``
+        and skipped.
+        """
+        def fetch(chunk):
+            result, missing = self._restore(checkpoint, chunk)
+            points = [item for _, item in missing]
 
-            for trj in data["result"]["trajectory"]:
-                trj["point_id"] = 1
+            try:
+                if not points:
+                    fetched = []
+                elif batch_size:
+                    fetched = self._batch_trajectories(points, options)
+                else:
+                    fetched = [
+                        Trajectory(self._point_trajectory(lat, long, point_id, **options))
+                        for point_id, (lat, long) in points
+                    ]
+            except Exception as e:
+                if on_error is None:
+                    raise
 
-            if "target_system" in options:
-                j = self._harmonize(
-                    data["result"]["trajectory"], target_system=options["target_system"]
-                )
-                data["result"]["trajectory"] = json.loads(j)
+                for point_id, point in points:
+                    on_error(point_id, point, e)
+
+                missing, fetched = [], []
+
+            self._record(checkpoint, missing, fetched, result)
+
+            return [result[position] for position, _ in chunk if position in result]
+
+        # Key each point by its position in the run, as the identifiers given by the caller may repeat.
+        tasks = _chunks(enumerate(points), batch_size or 1)
+
+        if max_workers is None or max_workers <= 1:
+            for task in tasks:
+                yield from fetch(task)
+
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+
+            try:
+                for task in tasks:
+                    pending.append(executor.submit(fetch, task))
+
+                    if len(pending) >= 2 * max_workers:
+                        yield from pending.popleft().result()
+
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _point_trajectory(self, latitude, longitude, point_id, **options):
+        """Retrieve the trajectory of a single location and tag its records with the point identifier."""
+        data = self._trajectory(**{"latitude": latitude, "longitude": longitude, **self._query_options(options)})
+
+        return self._stamp(data, point_id)
+
+    def _batch_trajectories(self, chunk, options):
+        """Retrieve the trajectories of a list of ``(point_id, (latitude, longitude))`` items.
+
+        The points are sent in a single batch request. If the server does not
+        support it, the client falls back to one request per point and does
+        not try batch requests again.
+        """
+        if self._batch_supported is not False:
+            try:
+                documents = self._trajectories([point for _, point in chunk], **self._query_options(options))
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in _BATCH_UNSUPPORTED:
+                    raise
+
+                self._batch_supported = False
+            else:
+                self._batch_supported = True
+
+                return [Trajectory(self._stamp(data, index)) for (index, _), data in zip(chunk, documents)]
 
-                return Trajectory(data)
+        return [Trajectory(self._point_trajectory(lat, long, index, **options)) for index, (lat, long) in chunk]
 
-            return Trajectory(data)
+    def harmonize(self, trajectories, target_system):
+        """Harmonize trajectories into a target classification system.
 
-        result = list()
-        index = 1
+        The LCCS mappings between the classification system of each collection
+        and the target system are retrieved once and kept in the metadata cache,
+        so harmonizing many trajectories only costs a table lookup per record.
 
-        for lat, long in zip(latitude, longitude):
-            validate_lat_long(lat, long)
+        Args:
+            trajectories (Trajectory or Trajectories): The trajectories to harmonize.
+            target_system (str): The identifier of the target classification system in the LCCS service.
+
+        Returns:
+            Trajectory or Trajectories: A copy of ``trajectories`` with the classes of the target system.
+        """
+        items = trajectories["trajectories"] if isinstance(trajectories, Trajectories) else [trajectories]
+        collections = {record["collection"] for tj in items for record in tj.trajectory}
 
-            data = self._trajectory(**{"latitude": lat, "longitude": long, **options})
+        lookup = self._harmonize_lookup(collections, target_system)
 
-            for trj in data["result"]["trajectory"]:
-                trj["point_id"] = index
+        return self._harmonized(trajectories, lookup)
 
-            index = index + 1
-            result.append(Trajectory(data))
+    def _harmonize_lookup(self, collections, target_system):
+        """Build the class lookup table of the given collections into the target system."""
+        mappings = {i: self._mappings(i, target_system) for i in collections}
 
-        return Trajectories({"trajectories": result})
+        return self._mapping_lookup(mappings)
 
-    def _harmonize(self, data, target_system):
-        """Harmonize the trajectories into target classification system."""
-        import pandas as pd
+    def _mappings(self, collection_id, target_system):
+        """Return the class pairs of the LCCS mappings from the classification system of a collection into the target system.
 
-        lccs_service = lccs.LCCS(url=self._lccs_url, access_token=self._access_token)
+        The pairs are kept in the metadata cache, indexed by the source and target systems.
+        """
+        ds = self._describe_collection(collection_id)
+        system_source = f"{ds['classification_system']['id']}"
 
-        df = pd.DataFrame(data)
+        mappings = self._cache_get(("mappings", system_source, target_system))
 
-        for i in df["collection"].unique():
-            ds = self._describe_collection(i)
-            mappings = lccs_service.mappings(
-                system_source=f"{ds['classification_system']['id']}",
+        if mappings is None:
+            mappings = self._class_pairs(self._lccs_service.mappings(
+                system_source=system_source,
                 system_target=target_system,
-            )
-            for map in mappings.mappings:
-                df.loc[
-                    (df["collection"] == i) & (df["class"] == map.source_class.title),
-                    ["class"],
-                ] = map.target_class.title
+            ))
+            self._cache.set(("mappings", system_source, target_system), mappings)
 
-        return df.to_json()
+        return mappings
 
     def _list_collections(self):
         """Return the list of available collections."""
-        result = self._get(self._url, op="list_collections")
+        result = self._cache_get(("list_collections",))
 
-        return result["collections"]
+        if result is None:
+            result = self._get(self._url, op="list_collections")
+            self._cache.set(("list_collections",), result)
+
+        return list(result["collections"])
 
     def _trajectory(self, **params):
         """Retrieve the trajectories of collections associated with a given location in space.
@@ -236,7 +541,44 @@ class WLTS:
          Returns:
             Trajectory: A trajectory object as a dictionary.
         """
-        return self._get(self._url, op="trajectory", **params)
+        key, data = self._cached_trajectory(params)
+
+        if data is None:
+            data = self._get(self._url, op="trajectory", **params)
+
+            if key is not None:
+                self._trajectory_cache.set(key, data)
+
+        return data
+
+    def _trajectories(self, points, **params):
+        """Retrieve the trajectories of many locations with a single batch request.
+
+        The points found in the trajectory cache are not sent to the server.
+
+        Returns:
+            list: A trajectory document for each point, in the order of the points.
+        """
+        keys, documents = [], []
+
+        for lat, long in points:
+            key, data = self._cached_trajectory({"latitude": lat, "longitude": long, **params})
+            keys.append(key)
+            documents.append(data)
+
+        missing = [i for i, data in enumerate(documents) if data is None]
+
+        if missing:
+            body = self._batch_body([points[i] for i in missing], params)
+            result = self._batch_documents(self._post(self._url, op="trajectory", body=body), len(missing))
+
+            for i, data in zip(missing, result):
+                documents[i] = data
+
+            if self._trajectory_cache is not None:
+                self._trajectory_cache.set_many((keys[i], documents[i]) for i in missing)
+
+        return documents
 
     def _describe_collection(self, collection_id):
         """Describe a give collection.
@@ -247,9 +589,15 @@ class WLTS:
         :returns: Collection description.
         :rtype: dict
         """
-        return self._get(
-            self._url, op="describe_collection", collection_id=collection_id
-        )
+        result = self._cache_get(("describe_collection", collection_id))
+
+        if result is None:
+            result = self._get(
+                self._url, op="describe_collection", collection_id=collection_id
+            )
+            self._cache.set(("describe_collection", collection_id), result)
+
+        return result
 
     def __getitem__(self, key):
         """Get collection whose name is identified by the key.
@@ -272,227 +620,65 @@ class WLTS:
 
         return Collections(service=self, metadata=cv_meta)
 
-    @property
-    def url(self):
-        """Return the WLTS server instance URL."""
-        return self._url
+    def __str__(self):
+        """Return the string representation of the WLTS object."""
+        text = f"WLTS:\n\tURL: {self._url}"
+
+        return text
+
+    def __repr__(self):
+        """Return the WTLS object representation."""
+        text = f'wlts(url="{self._url}")'
+
+        return text
 
-    @classmethod
-    def plot(cls, dataframe, **parameters):
-        """Plot the trajectory on a scatter or bar plot.
+    def describe_many(self, names, max_workers=8):
+        """Get the metadata of several collections, retrieving them concurrently.
 
         Args:
-            dataframe (pandas.DataFrame): The trajectory as dataframe representation.
+            names (list): The collection names.
+            max_workers (:obj:`int`, optional): The maximum number of concurrent requests. Defaults to 8.
 
-        Keyword Args:
-            marker_size (int): The marker size .
-            title (str): The title. Ex: Land Use and Cover Trajectory.
-            title_y (str): The title in the y-axis. Ex: Number of Points.
-            date (str): Title of date. Ex: Year.
-            value (str): The label of value. Ex: Collection.
-            width (int): The width size.
-            height (int): The height size.
-            font_size (int): The font size.
-            type (str): The graphic type: scatter or bar.
-            textfont_size (int): The text font size.
-            textangle (int): The text angle. Ex: 0.
-            textposition (str): Specifies the location of the text. Like “inside
-            cliponaxis (bool): Determines whether the text nodes are clipped abo
-            text_auto (bool): Determines  the display of text.
-            textposition (str): Specifies the location of the text.
-            opacity (float): The text opacity.
-            marker_line_width (float): The marker line width.
-            bar_title (bool): Update the title with spaces and letter uppercase.
+        Returns:
+            list: A :class:`wlts.collection.Collections` for each name, in the order of the names.
 
-        Raises:
-            ImportError: If plotly could not be imported.
+        Example:
+
+            .. doctest::
+                :skipif: WLTS_EXAMPLE_URL is None
 
+                >>> from wlts import *
+                >>> service = WLTS(WLTS_EXAMPLE_URL)
+                >>> collections = service.describe_many(['prodes_cerrado', 'deter_amazonia_legal'])
         """
-        try:
-            import plotly.express as px
-        except ImportError:
-            raise ImportError("You should install Plotly!")
-
-        parameters.setdefault("marker_size", 10)
-        parameters.setdefault("title", "Land Use and Cover Trajectory")
-        parameters.setdefault("title_y", "Number of Points")
-        parameters.setdefault("legend_title_text", "Class")
-        parameters.setdefault("date", "Year")
-        parameters.setdefault("value", "Collection")
-        parameters.setdefault("width", 950)
-        parameters.setdefault("height", 320)
-        parameters.setdefault("font_size", 12)
-        parameters.setdefault("type", "scatter")
-
-        # Parameters to update traces
-        parameters.setdefault("textfont_size", 12)
-        parameters.setdefault("textangle", 0)
-        parameters.setdefault("textposition", "auto")
-        parameters.setdefault("cliponaxis", False)
-
-        # Parameters to update layout
-        parameters.setdefault("text_auto", True)
-        parameters.setdefault("textposition", "auto")
-        parameters.setdefault("opacity", 0.8)
-        parameters.setdefault("marker_line_width", 1.5)
-
-        # Update column title bar plot
-        parameters.setdefault("bar_title", False)
-
-        df = dataframe.copy()
-        df["class"] = df["class"].astype("category")
-        df["date"] = df["date"].astype("category")
-        df["collection"] = df["collection"].astype("category")
-
-        def update_column_title(title):
-            """Update the collection name with spaces and capitalize."""
-            new_title = (title.text.split("=")[-1]).capitalize()
-
-            if len(new_title.split("_")) > 1:
-                return (
-                    new_title.split("_")[0]
-                    + " "
-                    + new_title.split("_")[-1].capitalize()
-                )
-
-            return new_title.split("_")[0]
-
-        if parameters["type"] == "scatter":
-            # Validates the data for this plot type
-            if len(dataframe.point_id.unique()) == 1:
-                fig = px.scatter(
-                    df,
-                    y=["class", "collection"],
-                    x="date",
-                    color="class",
-                    symbol="class",
-                    labels={
-                        "date": parameters["date"],
-                        "value": parameters["value"],
-                    },
-                    title=parameters["title"],
-                    width=parameters["width"],
-                    height=parameters["height"],
-                )
-                fig.update_traces(marker_size=parameters["marker_size"])
-                fig.update_layout(
-                    legend_title_text=parameters["legend_title_text"],
-                    font=dict(
-                        size=parameters["font_size"],
-                    ),
-                )
-
-                return fig
-            else:
-                raise ValueError(
-                    "The scatter plot is for one point only! Please try another type: bar plot."
-                )
-
-        if parameters["type"] == "bar":
-            # Validates the data for this plot type - Unique collection or multiples collections
-            if (
-                len(dataframe.collection.unique()) == 1
-                and len(dataframe.point_id.unique()) >= 1
-            ):
-                df_group = (
-                    dataframe.groupby(["date", "class"]).count()["point_id"].unstack()
-                )
-                fig = px.bar(
-                    df_group,
-                    title=parameters["title"],
-                    width=parameters["width"],
-                    height=parameters["height"],
-                    labels={"date": parameters["date"], "value": parameters["value"]},
-                    text_auto=parameters["text_auto"],
-                )
-                fig.update_layout(
-                    legend_title_text=parameters["legend_title_text"],
-                    font=dict(size=parameters["font_size"]),
-                )
-                fig.update_traces(
-                    textfont_size=parameters["textfont_size"],
-                    textangle=parameters["textangle"],
-                    textposition=parameters["textposition"],
-                    cliponaxis=parameters["cliponaxis"],
-                    opacity=parameters["opacity"],
-                    marker_line_width=parameters["marker_line_width"],
-                )
-
-                return fig
-
-            elif (
-                len(dataframe.collection.unique()) >= 1
-                and len(dataframe.point_id.unique()) >= 1
-            ):
-                mydf = (
-                    dataframe.groupby(["date", "collection"])
-                    .apply(lambda x: x.groupby("class").count())
-                    .rename(columns={"collection": "size", "date": "date_old"})
-                    .reset_index()
-                )
-
-                fig = px.bar(
-                    mydf,
-                    x="date",
-                    y="size",
-                    facet_col="collection",
-                    color="class",
-                    text="size",
-                    barmode="overlay",
-                    width=parameters["width"],
-                    height=parameters["height"],
-                    labels={
-                        "size": parameters["title_y"],
-                        "date": parameters["date"],
-                        "collection": "Collection",
-                    },
-                )
-
-                fig.update_traces(
-                    textfont_size=parameters["textfont_size"],
-                    textangle=parameters["textangle"],
-                    textposition=parameters["textposition"],
-                    cliponaxis=parameters["cliponaxis"],
-                    opacity=parameters["opacity"],
-                    marker_line_width=parameters["marker_line_width"],
-                )
-                fig.update_layout(
-                    legend_title_text="Class",
-                    font=dict(
-                        size=12,
-                    ),
-                    title_text=parameters["title"],
-                )
-
-                if parameters["bar_title"]:
-                    fig.for_each_annotation(
-                        lambda a: a.update(text=update_column_title(a))
-                    )
+        names = list(names)
 
-                return fig
-        else:
-            raise RuntimeError("No plot support for this trajectory!")
+        if len(names) <= 1 or not max_workers or max_workers <= 1:
+            return [self[name] for name in names]
 
-    def __str__(self):
-        """Return the string representation of the WLTS object."""
-        text = f"WLTS:\n\tURL: {self._url}"
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(names))) as executor:
+            return list(executor.map(self.__getitem__, names))
 
-        return text
+    def describe_all(self, max_workers=8):
+        """Get the metadata of all the collections available in the service, retrieving them concurrently.
 
-    def __repr__(self):
-        """Return the WTLS object representation."""
-        text = f'wlts(url="{self._url}")'
+        Args:
+            max_workers (:obj:`int`, optional): The maximum number of concurrent requests. Defaults to 8.
 
-        return text
+        Returns:
+            list: A :class:`wlts.collection.Collections` for each collection, in the order of :attr:`collections`.
+        """
+        return self.describe_many(self.collections, max_workers)
 
     def __iter__(self):
         """Iterate over collections available in the service.
 
+        The collection descriptions are retrieved concurrently with :meth:`describe_all`.
+
         Returns:
             A collection at each iteration.
         """
-        for cl_name in self.collections:
-            yield self[cl_name]
+        yield from self.describe_all()
 
     def _repr_html_(self):
         """Display the WLTS object as HTML.
@@ -521,16 +707,22 @@ class WLTS:
         :rtype: dict
 
         :raises ValueError: If the response body does not contain a valid json.
-       """ 
-        url = f"{self._url}/{op}"
-        params.setdefault("access_token", self._access_token)
+        """
+        url, params = self._request(op, params)
 
-        with httpx.Client() as client:
-            response = client.get(url, params=params, headers=self._headers)
-            response.raise_for_status()
+        with self._observe(op, "GET", url) as call:
+            response = call["response"] = self.client.get(url, params=params, headers=self._headers)
+
+        return self._parse(response, op)
+
+    def _post(self, url, op, body, **params):
+        """Query the WLTS service using HTTP POST verb with a JSON body and return the result as a JSON document.
+
+        :raises ValueError: If the response body does not contain a valid json.
+        """
+        url, params = self._request(op, params)
 
-        content_type = response.headers.get("content-type", "")
-        if "application/json" not in content_type:
-            raise ValueError(f"HTTP Response is not JSON: Content-Type: {content_type}")
+        with self._observe(op, "POST", url) as call:
+            response = call["response"] = self.client.post(url, params=params, json=body, headers=self._headers)
 
-        return response.json()
\ No newline at end of file
+        return self._parse(response, op)
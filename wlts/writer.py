@@ -0,0 +1,324 @@
+#
+# This file is part of Python Client Library for the WLTS.
+# Copyright (C) 2022 INPE.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <https://www.gnu.org/licenses/gpl-3.0.html>.
+#
+"""Streaming writers of trajectories into columnar and text files."""
+import csv
+import json
+import os
+from typing import IO, Any, Dict, Iterable, List, Optional
+
+#: File extensions of each output format.
+FORMATS = {
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.geoparquet': 'geoparquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+
+#: Columns written with dictionary encoding.
+_DICTIONARY = ('class', 'collection')
+
+
+def _epsg_4326() -> Dict[str, Any]:
+    """Return the PROJJSON definition of EPSG:4326, the CRS of the trajectory geometries."""
+    from pyproj import CRS
+
+    return CRS.from_epsg(4326).to_json_dict()
+
+
+class TrajectoryWriter:
+    """Write the records of trajectories to Parquet, GeoParquet or Arrow IPC files as they arrive.
+
+    The records are buffered and written in row groups (record batches) of
+    ``row_group_size`` records, so a stream of trajectories, such as
+    :meth:`wlts.WLTS.iter_trajectories`, is persisted with a flat memory usage.
+    The ``class`` and ``collection`` columns are dictionary-encoded.
+
+    The columns are taken from the first row group. In GeoParquet files the
+    ``geom`` column is encoded as WKB, while the other formats keep it as GeoJSON text.
+
+    Example:
+        .. doctest::
+            :skipif: WLTS_EXAMPLE_URL is None
+
+            >>> from wlts import *
+            >>> from wlts.writer import TrajectoryWriter
+            >>> service = WLTS(WLTS_EXAMPLE_URL)
+            >>> points = ((-12.0 - i * 0.01, -54.0) for i in range(100))
+            >>> with TrajectoryWriter('trajectories.parquet') as writer:
+            ...     writer.write_all(service.iter_trajectories(points, collections='mapbiomas-v6', max_workers=4))
+    """
+
+    def __init__(self, path: Any, format: Optional[str] = None, row_group_size: int = 65536,
+                 **options: Any) -> None:
+        """Create a writer.
+
+        Args:
+            path: The path, or a writable binary file object, of the output file.
+            format (str, optional): ``parquet``, ``geoparquet`` or ``arrow`` (IPC file).
+                By default, it is given by the file extension.
+            row_group_size (int): The number of records in each row group.
+            options: Extra keyword arguments for ``pyarrow.parquet.ParquetWriter``, such as ``compression``.
+
+        Raises:
+            ImportError: If PyArrow could not be imported.
+            ValueError: If the format is unknown.
+
+        .. note::
+            Writing a GeoParquet file raises ``RuntimeError`` if the records have no ``geom`` column.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("You should install PyArrow!")
+
+        if format is None:
+            extension = os.path.splitext(str(path))[1].lower()
+            format = FORMATS.get(extension, 'parquet')
+
+        if format not in FORMATS.values():
+            raise ValueError(f"Unknown format {format}, use one of {sorted(set(FORMATS.values()))}.")
+
+        self.path = path
+        self.format = format
+        self.row_group_size = row_group_size
+        self._pa = pa
+        self._options = options
+        self._buffer: List[Dict[str, Any]] = []
+        self._dictionaries: Dict[str, Dict[str, int]] = {key: dict() for key in _DICTIONARY}
+        self._schema = None
+        self._writer = None
+        self.rows = 0
+
+    def write(self, trajectory: Any) -> None:
+        """Add the records of a trajectory, writing a row group when the buffer is full."""
+        self._buffer.extend(trajectory.trajectory)
+
+        if len(self._buffer) >= self.row_group_size:
+            self._write(len(self._buffer) - len(self._buffer) % self.row_group_size)
+
+    def write_all(self, trajectories: Iterable[Any]) -> None:
+        """Add the records of an iterable of trajectories, such as a stream, consuming it one at a time."""
+        for trajectory in trajectories:
+            self.write(trajectory)
+
+    def flush(self) -> None:
+        """Write all the buffered records, the last row group being possibly smaller."""
+        self._write(len(self._buffer))
+
+    def _write(self, size: int) -> None:
+        """Write the first ``size`` buffered records as row groups."""
+        records, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        for start in range(0, len(records), self.row_group_size):
+            group = records[start:start + self.row_group_size]
+
+            batch = self._batch(group)
+
+            if self._writer is None:
+                self._writer = self._open(batch.schema)
+
+            self._writer.write_batch(batch)
+            self.rows += len(group)
+
+    def close(self) -> None:
+        """Write the remaining records and close the file."""
+        self.flush()
+
+        if self._writer is None:
+            return
+
+        self._writer.close()
+        self._writer = None
+
+    def __enter__(self) -> "TrajectoryWriter":
+        """Use the writer as a context manager."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Close the writer."""
+        self.close()
+
+    def _open(self, schema: Any) -> Any:
+        """Open the file writer for the schema of the first row group."""
+        pa = self._pa
+
+        if self.format == 'arrow':
+            # The dictionaries only grow, so later row groups are written as dictionary deltas.
+            options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            return pa.ipc.new_file(self.path, schema, options=options)
+
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(self.path, schema, **self._options)
+
+    def _batch(self, records: List[Dict[str, Any]]) -> Any:
+        """Build a record batch from a list of records."""
+        pa = self._pa
+
+        names = [field.name for field in self._schema] if self._schema is not None else \
+            list(dict.fromkeys(key for record in records for key in record))
+
+        if self.format == 'geoparquet' and 'geom' not in names:
+            raise RuntimeError("Geometry field not exist! Verify if you pass geometry=True in service.trj!")
+
+        arrays = []
+
+        for name in names:
+            values = [record.get(name) for record in records]
+
+            if name in self._dictionaries:
+                arrays.append(self._dictionary_array(name, values))
+            elif name == 'geom':
+                arrays.append(self._geometry_array(values))
+            elif self._schema is not None:
+                arrays.append(pa.array(values, type=self._schema.field(name).type))
+            else:
+                arrays.append(pa.array(values))
+
+        if self._schema is None:
+            metadata = None
+
+            if self.format == 'geoparquet':
+                geo = {
+                    'version': '1.0.0',
+                    'primary_column': 'geom',
+                    'columns': {'geom': {'encoding': 'WKB', 'geometry_types': [], 'crs': _epsg_4326()}},
+                }
+                metadata = {b'geo': json.dumps(geo).encode()}
+
+            self._schema = pa.schema([pa.field(name, array.type) for name, array in zip(names, arrays)],
+                                     metadata=metadata)
+
+        return pa.record_batch(arrays, schema=self._schema)
+
+    def _dictionary_array(self, name: str, values: List[Any]) -> Any:
+        """Encode the values of a column with the dictionary built over all the row groups."""
+        pa = self._pa
+        dictionary = self._dictionaries[name]
+
+        indices = [None if value is None else dictionary.setdefault(value, len(dictionary)) for value in values]
+
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                              pa.array(list(dictionary), type=pa.string()))
+
+    def _geometry_array(self, values: List[Any]) -> Any:
+        """Encode the GeoJSON geometries as WKB for GeoParquet, or as GeoJSON text otherwise."""
+        pa = self._pa
+
+        keys = [None if value is None else json.dumps(value, sort_keys=True) for value in values]
+
+        if self.format != 'geoparquet':
+            return pa.array(keys, type=pa.string())
+
+        from shapely.geometry import shape
+
+        # Records of the same pixel share their geometry, so each one is encoded once per row group.
+        wkb: Dict[str, bytes] = dict()
+
+        for key, value in zip(keys, values):
+            if key is not None and key not in wkb:
+                wkb[key] = shape(value).wkb
+
+        return pa.array([None if key is None else wkb[key] for key in keys], type=pa.binary())
+
+
+class RecordWriter:
+    """Write the records of trajectories to a CSV or NDJSON text stream as they arrive.
+
+    Each record is written as soon as its trajectory is given, so the output can be
+    piped into other programs. Geometries are written as GeoJSON text.
+    """
+
+    def __init__(self, stream: IO[str], format: str = 'csv') -> None:
+        """Create a writer.
+
+        Args:
+            stream: A writable text stream, such as an open file or ``sys.stdout``.
+            format (str): ``csv`` or ``ndjson``.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        if format not in ('csv', 'ndjson'):
+            raise ValueError(f"Unknown format {format}, use one of ['csv', 'ndjson'].")
+
+        self.stream = stream
+        self.format = format
+        self.rows = 0
+        self._csv = None
+
+    def write(self, trajectory: Any) -> None:
+        """Write the records of a trajectory."""
+        for record in trajectory.trajectory:
+            if self.format == 'ndjson':
+                self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            else:
+                self._write_csv(record)
+
+            self.rows += 1
+
+        self.stream.flush()
+
+    def write_all(self, trajectories: Iterable[Any]) -> None:
+        """Write the records of an iterable of trajectories, consuming it one at a time."""
+        for trajectory in trajectories:
+            self.write(trajectory)
+
+    def _write_csv(self, record: Dict[str, Any]) -> None:
+        """Write a record as a CSV row, taking the columns from the first record."""
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.stream, fieldnames=list(record), extrasaction='ignore')
+            self._csv.writeheader()
+
+        if 'geom' in record:
+            record = dict(record, geom=json.dumps(record['geom']))
+
+        self._csv.writerow(record)
+
+    def close(self) -> None:
+        """Flush the stream. The stream itself is left open."""
+        self.stream.flush()
+
+    def __enter__(self) -> "RecordWriter":
+        """Use the writer as a context manager."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Flush the stream."""
+        self.close()
+
+
+def write_trajectories(trajectories: Iterable[Any], path: Any, format: Optional[str] = None,
+                       **options: Any) -> int:
+    """Write an iterable of trajectories to a Parquet, GeoParquet or Arrow IPC file.
+
+    Args:
+        trajectories: An iterable of :class:`wlts.trajectory.Trajectory`, such as a stream.
+        path: The path, or a writable binary file object, of the output file.
+        format (str, optional): ``parquet``, ``geoparquet`` or ``arrow``. By default, it is given by the file extension.
+        options: Extra keyword arguments for :class:`TrajectoryWriter`.
+
+    Returns:
+        int: The number of records written.
+    """
+    with TrajectoryWriter(path, format, **options) as writer:
+        writer.write_all(trajectories)
+
+    return writer.rows